@@ -4,8 +4,43 @@
         
         Holds classes that I want to keep, but don't necessarily belong in this package.
 """
-from functools import partial
+from functools import partial, lru_cache
 from collections import namedtuple
+from collections.abc import Mapping
+from threading import Lock
+
+# the number of namedtuple classes to keep
+MAX_CACHED_TUPLES = 1024
+_cache_lock = Lock()
+
+@lru_cache(maxsize=MAX_CACHED_TUPLES)
+def _tuple_class(name, fields):
+    return namedtuple(name, fields)
+
+
+def _cached_namedtuple(name, fields):
+    """ helper to get the namedtuple class for name and fields, making it if needed.
+        Making a class is a lot slower than making an instance, so helpers with the same
+        name and fields share one class.  Locked, so threads making the same class at
+        the same time get the same one.
+    """
+    with _cache_lock:
+        return _tuple_class(name, tuple(fields))
+
+
+def _iter_rows(factory, rows):
+    """ helper generator for NamedTupleHelper.iter_many's rows. """
+    for row in rows:
+        if isinstance(row, Mapping):
+            yield factory(**row)
+        else:
+            yield factory(*row)
+
+
+def _iter_columns(factory, names, values):
+    """ helper generator for NamedTupleHelper.iter_many's columns. """
+    for row in zip(*values):
+        yield factory(**dict(zip(names, row)))
 
 
 class NamedTupleHelper:
@@ -42,6 +77,9 @@ class NamedTupleHelper:
         self.partial = None
         self.combines = combines
         self._instance = None
+        self._tuple_class = None
+        # name -> NamedTupleHelper made by clean_tuple
+        self._clean_tuples = {}
 
         if combines is not None:
             if isinstance(combines, (tuple, list)):
@@ -101,7 +139,7 @@ class NamedTupleHelper:
                     dct.update(comb._asdict())
 
             # create a new namedtuple with all of our fields
-            new_tuple = namedtuple(name, fields)
+            new_tuple = _cached_namedtuple(name, fields)
             
             # return a partial of our new tuple with the values from
             # the tuples we've combined.  This allows us to only have to 
@@ -132,13 +170,63 @@ class NamedTupleHelper:
                         FreshKey(name='Fresh Id', id='Fresh Name')
                         
         """
-        return namedtuple(name, fields)
+        return _cached_namedtuple(name, fields)
    
     def clean_tuple(self, name):
-        """ Returns a new instance of NamedTupleHelper, with all the fields, but none of the 
-            combined values. 
+        """ Returns an instance of NamedTupleHelper, with all the fields, but none of the 
+            combined values.  The same instance is returned for the same name.
+        """
+        rv = self._clean_tuples.get(name)
+        if rv is None:
+            rv = self._clean_tuples.setdefault(name, NamedTupleHelper(name, *self._fields))
+        return rv
+
+    def _get_tuple_class(self):
+        """ helper to get the (cached) namedtuple class that this helper makes. """
+        if self.partial is not None:
+            return self.partial.func
+        if self._tuple_class is None:
+            self._tuple_class = self._new_tuple(self.name, self._fields)
+        return self._tuple_class
+
+    def iter_many(self, rows=None, columns=None):
+        """ Returns an iterator of namedtuple's (all of the same class) made from :rows:
+            or :columns:, for making a lot of keys at once.  Does not set any state on
+            the helper, so it's safe to use from several threads.  The arguments are
+            checked when it's called, not when the iterator is first used.
+
+            :param rows:        An iterable of sequences (args) or mappings (kwargs), each
+                                is the same as the args or kwargs passed in to call the
+                                helper.
+            :param columns:     A mapping of field -> iterable of values, all of the same
+                                length.  Columns that are not sequences (ex. generators)
+                                are read in to a list first.
+
+            :ex:
+                >>> S = NamedTupleHelper('S', 'id', 'name')
+                >>> list(S.iter_many(columns={'id': [1, 2], 'name': ['a', 'b']}))
+                [S(id=1, name='a'), S(id=2, name='b')]
         """
-        return NamedTupleHelper(name, *self._fields)
+        if (rows is None) == (columns is None):
+            raise ValueError('pass in either rows or columns')
+        tuple_class = self._get_tuple_class()
+        factory = self.partial if self.partial is not None else tuple_class
+
+        if rows is not None:
+            return _iter_rows(factory, rows)
+
+        names = list(columns)
+        values = [columns[name] for name in names]
+        values = [v if hasattr(v, '__len__') else list(v) for v in values]
+        if len(set(len(v) for v in values)) > 1:
+            raise ValueError('columns must all be the same length')
+        if self.partial is None and names == list(tuple_class._fields):
+            return map(tuple_class._make, zip(*values))
+        return _iter_columns(factory, names, values)
+
+    def make_many(self, rows=None, columns=None):
+        """ Same as iter_many, but returns a list. """
+        return list(self.iter_many(rows=rows, columns=columns))
 
     def __repr__(self):
         return '<NamedTupleHelper: {}>'.format(self.name)
@@ -158,8 +246,7 @@ class NamedTupleHelper:
         if self.partial is not None:
             self._instance = self.partial(*args, **kwargs)
         else:
-            new_tuple = self._new_tuple(self.name, self._fields)
-            self._instance = new_tuple(*args, **kwargs)
+            self._instance = self._get_tuple_class()(*args, **kwargs)
 
         return self._instance
 
@@ -0,0 +1,546 @@
+"""
+    proxies.bench
+    ~~~~~~~~~~~~~
+
+        Micro-benchmarks for the hot paths of this package.  Run them with
+        ``python -m proxies.bench [name ...]``, which prints the results as JSON
+        (``--format text`` for people, ``--output`` to write them to a file).  Slow
+        benchmarks only run when named or with ``--all``.
+
+        To guard against regressions, store a baseline and compare later runs with it,
+        which exits with 1 if any benchmark got slower than the threshold:
+
+            python -m proxies.bench --repeat 5 --output baseline.json
+            python -m proxies.bench --compare baseline.json --threshold 0.25
+"""
+import os
+import sys
+import json
+import platform
+import argparse
+import time
+import timeit
+import tempfile
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict, namedtuple
+from statistics import median
+
+from .cache import RenderCache
+from .core import BaseViewContext
+from .context_registry import ContextRegistry
+from .model_view import BaseModelViewProxy
+from .schema_helper import SchemaLabelMeta, SchemaLabelProtocol
+from .shared_cache import SharedRenderCache
+from .utils import OrderedLabels, TypeParser, get_first
+
+try:
+    # extra.py lives next to the package, so it's only importable from the repo root
+    import extra
+except ImportError:
+    extra = None
+
+BENCHMARKS = OrderedDict()
+# names of benchmarks that only run when asked for
+SLOW_BENCHMARKS = set()
+
+def benchmark(name, slow=False):
+    """ Register a benchmark function under :name:.  A benchmark function returns
+        a dict of case name -> seconds per call, or bytes for cases that start
+        with 'bytes'.
+    """
+    def benchmark_decorator(f):
+        BENCHMARKS[name] = f
+        if slow:
+            SLOW_BENCHMARKS.add(name)
+        return f
+    return benchmark_decorator
+
+
+def time_per_call(func, number=10000, repeat=5):
+    """ Best of :repeat: runs of :number: calls, in seconds per call. """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def _context_classes(count):
+    return [type('Context{}'.format(i), (BaseViewContext,), {}) for i in range(count)]
+
+
+@benchmark('registry')
+def bench_registry(sizes=(10, 100, 1000, 10000)):
+    """ ContextRegistry get and replace at increasing numbers of sub-keys. """
+    results = OrderedDict()
+    for size in sizes:
+        registry = ContextRegistry()
+        for i, context in enumerate(_context_classes(size)):
+            registry['sub{}'.format(i)] = context
+        # the middle key, so a linear scan would have to do real work
+        key = 'sub{}'.format(size // 2)
+        context = registry[key]
+        results['get[{}]'.format(size)] = time_per_call(lambda: registry.get(key))
+
+        def replace():
+            registry[key] = context
+        results['setitem[{}]'.format(size)] = time_per_call(replace)
+    return results
+
+
+@benchmark('register_contexts')
+def bench_register_contexts(sizes=(100, 1000), keys=10):
+    """ Registering size contexts (over :keys: keys) one register_context call at a time,
+        compared to one register_contexts call.  Seconds for all of them.
+    """
+    results = OrderedDict()
+    for size in sizes:
+        contexts = _context_classes(size)
+        flat = OrderedDict(('key{}.sub{}'.format(i % keys, i), context) \
+                for i, context in enumerate(contexts))
+
+        def one_at_a_time():
+            proxy = BaseModelViewProxy(BenchModel)
+            for name, context in flat.items():
+                key, sub_key = name.split('.')
+                proxy.register_context(key, sub_key, context)
+
+        def bulk():
+            BaseModelViewProxy(BenchModel).register_contexts(flat)
+
+        results['register_context[{}]'.format(size)] = time_per_call(one_at_a_time, number=5)
+        results['register_contexts[{}]'.format(size)] = time_per_call(bulk, number=5)
+    return results
+
+
+class BenchModel(SchemaLabelProtocol):
+    labels = {'id': 'Id', 'fn': 'First Name', 'ln': 'Last Name', 'email': 'Email'}
+
+
+class BenchViewContext(BaseViewContext):
+
+    def render(self, *args, **kwargs):
+        return ''
+
+
+@benchmark('render')
+def bench_render():
+    """ render() string dispatch compared to a renderer from get_renderer(). """
+    proxy = BaseModelViewProxy(BenchModel)
+    proxy.register_context('table', 'default', BenchViewContext)
+    proxy.register_context('table', 'instance', BenchViewContext(model=BenchModel))
+    results = OrderedDict()
+    for spec in ('table', 'table.default', 'table.instance'):
+        renderer = proxy.get_renderer(spec)
+        results['render[{}]'.format(spec)] = time_per_call(lambda: proxy.render(spec))
+        results['renderer[{}]'.format(spec)] = time_per_call(renderer)
+    proxy.collect_stats = True
+    results['render_with_stats[table.instance]'] = time_per_call(
+            lambda: proxy.render('table.instance'))
+    return results
+
+
+class BenchOrderedContext(BaseViewContext):
+    label_order = {'email': 0, 'id': -1}
+
+    def render(self, *args, **kwargs):
+        return ''
+
+
+@benchmark('freeze')
+def bench_freeze():
+    """ render() dispatch on a frozen proxy compared to the same proxy unfrozen. """
+    results = OrderedDict()
+    proxies = OrderedDict()
+    for name in ('unfrozen', 'frozen'):
+        proxy = BaseModelViewProxy(BenchModel)
+        proxy.register_context('table', 'default', BenchViewContext)
+        proxy.register_context('table', 'ordered', BenchOrderedContext)
+        proxies[name] = proxy
+    proxies['frozen'].freeze()
+    for spec in ('table', 'table.default', 'table.ordered'):
+        for name, proxy in proxies.items():
+            results['{}[{}]'.format(name, spec)] = time_per_call(lambda: proxy.render(spec))
+    return results
+
+
+_WARM_START_MODULE = """
+from proxies.core import BaseViewContext
+
+"""
+
+_WARM_START_CLASS = """
+class Context{index}(BaseViewContext):
+    label_order = {{'col{index}': 0, 'id': -1}}
+
+    def render(self, *args, **kwargs):
+        return ','.join(self.labels)
+"""
+
+@benchmark('warm_start')
+def bench_warm_start(modules=10, classes=5, sub_keys=200, columns=500):
+    """ Starting up a proxy in a new worker, with :sub_keys: contexts from :modules:
+        modules of :classes: context classes, on a model with :columns: labels.  Imports
+        and registers every context and freezes, compared to freezing from a snapshot.
+        The modules are written to a temporary directory and taken out of sys.modules
+        (and the label order cache is cleared) before each run, as in a new worker.
+    """
+    from importlib import import_module
+    from . import snapshot
+    labels = OrderedDict(('col{}'.format(i), 'Col {}'.format(i)) for i in range(columns))
+    labels.update(BenchModel.labels)
+    model = SchemaLabelMeta('BenchWideModel', (SchemaLabelProtocol,), {'labels': labels})
+    names = ['_proxies_bench_warm{}'.format(i) for i in range(modules)]
+
+    def new_worker():
+        OrderedLabels._key_orders.clear()
+        for name in names:
+            sys.modules.pop(name, None)
+
+    def cold():
+        new_worker()
+        contexts = []
+        for name in names:
+            module = import_module(name)
+            contexts.extend(getattr(module, 'Context{}'.format(i)) for i in range(classes))
+        proxy = BaseModelViewProxy(model)
+        proxy.register_contexts(dict(('key{}.sub{}'.format(i % 10, i),
+                contexts[i % len(contexts)]) for i in range(sub_keys)))
+        return proxy.freeze()
+
+    def warm():
+        new_worker()
+        return snapshot.load(BaseModelViewProxy(model), json.loads(document), freeze=True)
+
+    results = OrderedDict()
+    with tempfile.TemporaryDirectory() as directory:
+        for name in names:
+            with open(os.path.join(directory, name + '.py'), 'w') as f:
+                f.write(_WARM_START_MODULE + ''.join(_WARM_START_CLASS.format(index=i) \
+                        for i in range(classes)))
+        sys.path.insert(0, directory)
+        try:
+            document = snapshot.dumps(cold())
+            results['register[{}]'.format(sub_keys)] = time_per_call(cold, number=20)
+            results['load_snapshot[{}]'.format(sub_keys)] = time_per_call(warm, number=20)
+            # a worker that only renders one context only imports one module
+            results['load_snapshot_render_one[{}]'.format(sub_keys)] = time_per_call(
+                    lambda: warm().render('key0.sub0'), number=20)
+            results['bytes_snapshot[{}]'.format(sub_keys)] = len(document)
+        finally:
+            sys.path.remove(directory)
+            new_worker()
+    return results
+
+
+@benchmark('shared_cache')
+def bench_shared_cache():
+    """ SharedRenderCache get and set compared to the in process RenderCache. """
+    results = OrderedDict()
+    value = '<tr><td>cell</td></tr>' * 100
+    key = ('table', 'default', BenchViewContext, (('page', 1), ()), BenchModel)
+    with tempfile.TemporaryDirectory() as directory:
+        caches = (('render_cache', RenderCache(maxsize=1024)),
+                ('shared_cache', SharedRenderCache(os.path.join(directory, 'cache'))))
+        for name, cache in caches:
+            cache.set(key, value)
+            results['{}_get'.format(name)] = time_per_call(lambda: cache.get(key))
+            results['{}_set'.format(name)] = time_per_call(lambda: cache.set(key, value))
+        caches[1][1].close()
+    return results
+
+
+@benchmark('ordered_labels')
+def bench_ordered_labels(sizes=(10, 200, 1000)):
+    """ OrderedLabels construction for models with increasing numbers of columns. """
+    results = OrderedDict()
+    for size in sizes:
+        labels = OrderedDict(('col{}'.format(i), 'Col {}'.format(i)) for i in range(size))
+        order = {'col1': 0, 'col2': 1, 'col0': -1}
+        results['ordered[{}]'.format(size)] = time_per_call(
+                lambda: OrderedLabels(labels, order), number=1000)
+        results['unordered[{}]'.format(size)] = time_per_call(
+                lambda: OrderedLabels(labels, {}), number=1000)
+    return results
+
+
+class BenchRowsContext(BaseViewContext):
+
+    def render_rows(self, rows):
+        cells = list(self.labels.values())
+        return ''.join('<tr>' + ''.join('<td>{} {}</td>'.format(cell, row) for cell in cells) \
+                + '</tr>' for row in rows)
+
+
+@benchmark('render_parallel', slow=True)
+def bench_render_parallel(rows=200000, workers=(1, 2, 4, 8), chunk_size=5000):
+    """ render_parallel wall time for a large table across numbers of worker processes,
+        compared to rendering all the rows in this process.  The pool is started before
+        timing, so only rendering and pickling get measured.
+    """
+    proxy = BaseModelViewProxy(BenchModel)
+    proxy.register_context('table', 'default', BenchRowsContext)
+    results = OrderedDict()
+    context = proxy.init_context('table', 'default')
+    start = time.perf_counter()
+    context.render_rows(range(rows))
+    results['serial[{}]'.format(rows)] = time.perf_counter() - start
+    for count in workers:
+        if count > (os.cpu_count() or 1):
+            continue
+        with ProcessPoolExecutor(max_workers=count) as executor:
+            # start the worker processes
+            list(executor.map(abs, range(count)))
+            start = time.perf_counter()
+            proxy.render_parallel('table', range(rows), chunk_size=chunk_size,
+                    executor=executor)
+            results['workers[{}]'.format(count)] = time.perf_counter() - start
+    return results
+
+
+def _label_mixins(depth, width):
+    """ helper to make a chain of :depth: SchemaLabelProtocol mixins, each declaring
+        :width: labels.
+    """
+    base = SchemaLabelProtocol
+    for level in range(depth):
+        labels = dict(('col{}_{}'.format(level, i), 'Col {}'.format(i)) for i in range(width))
+        base = SchemaLabelMeta('Mixin{}'.format(level), (base,), {'labels': labels})
+    return base
+
+
+@benchmark('label_classes')
+def bench_label_classes(count=10000, depth=3, width=20, depths=(1, 3, 6)):
+    """ SchemaLabelMeta class creation on top of mixin chains, time and memory. """
+    results = OrderedDict()
+    for chain_depth in depths:
+        chain = _label_mixins(chain_depth, width)
+        results['create[depth={}]'.format(chain_depth)] = time_per_call(
+                lambda: SchemaLabelMeta('Model', (chain,), {}), number=1000)
+
+    mixin = _label_mixins(depth, width)
+    classes = []
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(count):
+            classes.append(SchemaLabelMeta('Model{}'.format(i), (mixin,), {}))
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    results['bytes_per_class[{}]'.format(count)] = (after - before) / count
+    return results
+
+
+@benchmark('type_parser')
+def bench_type_parser(sizes=(2, 10, 100)):
+    """ TypeParser and get_first over mixed argument tuples. """
+    get_strings = TypeParser(str)
+    get_first_string = get_first(get_strings)
+    results = OrderedDict()
+    for size in sizes:
+        args = tuple(('key{}'.format(i), i, {})[i % 3] for i in range(size))
+        results['list[{}]'.format(size)] = time_per_call(lambda: get_strings(args, list))
+        results['tuple[{}]'.format(size)] = time_per_call(lambda: get_strings(args, 'tuple'))
+        results['get_first[{}]'.format(size)] = time_per_call(lambda: get_first_string(args))
+    return results
+
+
+@benchmark('named_tuple_helper')
+def bench_named_tuple_helper():
+    """ NamedTupleHelper calls (the namedtuple class is cached), against making the
+        namedtuple class on every call.
+    """
+    if extra is None:
+        return OrderedDict()
+    PersonKey = extra.NamedTupleHelper('PersonKey', 'id', 'name')
+    person = PersonKey('Id', 'Name')
+    EmployeeKey = extra.NamedTupleHelper('EmployeeKey', 'employee_no', combines=(person,))
+    results = OrderedDict()
+    results['call'] = time_per_call(lambda: PersonKey('Id', 'Name'))
+    results['call_combined'] = time_per_call(lambda: EmployeeKey('No'))
+    rows = [(i, 'Name') for i in range(1000)]
+    columns = {'id': list(range(1000)), 'name': ['Name'] * 1000}
+    # per tuple
+    results['make_many_rows[1000]'] = time_per_call(lambda: PersonKey.make_many(rows),
+            number=100) / 1000
+    results['make_many_columns[1000]'] = time_per_call(
+            lambda: PersonKey.make_many(columns=columns), number=100) / 1000
+    results['new_helper_call'] = time_per_call(
+            lambda: extra.NamedTupleHelper('PersonKey', 'id', 'name')('Id', 'Name'),
+            number=1000)
+    results['uncached_namedtuple'] = time_per_call(
+            lambda: namedtuple('PersonKey', ['id', 'name'])('Id', 'Name'), number=1000)
+    return results
+
+
+def run(names=None, include_slow=False):
+    """ Run the benchmarks for :names:, or all but the slow ones (unless :include_slow:)
+        if no names are given.
+    """
+    if not names:
+        names = [name for name in BENCHMARKS if include_slow or name not in SLOW_BENCHMARKS]
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if len(unknown) > 0:
+        raise KeyError(', '.join(unknown))
+    return OrderedDict((name, BENCHMARKS[name]()) for name in names)
+
+
+def run_repeated(names=None, include_slow=False, repeat=5):
+    """ Run the benchmarks :repeat: times, returning a dict of name -> case -> list of
+        values (one per run).
+    """
+    samples = OrderedDict()
+    for _ in range(repeat):
+        for name, cases in run(names, include_slow=include_slow).items():
+            for case, value in cases.items():
+                samples.setdefault(name, OrderedDict()).setdefault(case, []).append(value)
+    return samples
+
+
+def quartiles(values):
+    """ Returns the (first quartile, median, third quartile) of :values:. """
+    values = sorted(values)
+    half = len(values) // 2
+    if len(values) == 1:
+        return (values[0], values[0], values[0])
+    lower = values[:half]
+    upper = values[-half:]
+    return (median(lower), median(values), median(upper))
+
+
+def summarize(samples):
+    """ Reduce the samples from run_repeated to their medians. """
+    return OrderedDict((name, OrderedDict((case, median(values)) \
+            for case, values in cases.items())) for name, cases in samples.items())
+
+
+def results_document(results, samples=None):
+    """ Wrap the results from run in a dict with details about where they were run.
+        :samples: (from run_repeated) get included so the document can be used as
+        a baseline for compare.
+    """
+    rv = OrderedDict([
+            ('python', platform.python_version()),
+            ('implementation', platform.python_implementation()),
+            ('platform', platform.platform()),
+            ('cpu_count', os.cpu_count()),
+            ('timestamp', time.time()),
+            ('benchmarks', results)])
+    if samples is not None:
+        rv['samples'] = samples
+    return rv
+
+
+def compare(baseline, current, threshold=0.25):
+    """ Compare two results documents.  A case is a regression when it's median is more
+        than :threshold: (a fraction) above the baseline median and the middle half of
+        it's samples (the IQR) is entirely above the baseline's, so a noisy run does
+        not count.  Cases missing from either document are skipped.
+
+        :returns:   A list of (name, case, baseline median, current median, ratio,
+                    regressed) tuples.
+    """
+    rv = []
+    for name, cases in current['benchmarks'].items():
+        for case in cases:
+            try:
+                base_values = _case_samples(baseline, name, case)
+            except KeyError:
+                continue
+            values = _case_samples(current, name, case)
+            base_q1, base_median, base_q3 = quartiles(base_values)
+            q1, current_median, q3 = quartiles(values)
+            ratio = current_median / base_median if base_median else float('inf')
+            regressed = ratio > 1 + threshold and q1 > base_q3
+            rv.append((name, case, base_median, current_median, ratio, regressed))
+    return rv
+
+
+def _case_samples(document, name, case):
+    """ helper to get the samples for a case from a results document, documents without
+        samples only have the one value.
+    """
+    try:
+        return document['samples'][name][case]
+    except KeyError:
+        return [document['benchmarks'][name][case]]
+
+
+def format_comparison(comparison):
+    lines = []
+    for name, case, base, current, ratio, regressed in comparison:
+        lines.append('{:<10} {:<16} {:<30} {:>7.2f}x'.format(
+            'REGRESSED' if regressed else 'ok', name, case, ratio))
+    return '\n'.join(lines)
+
+
+def format_text(results):
+    lines = []
+    for name, cases in results.items():
+        lines.append(name)
+        for case, value in cases.items():
+            if case.startswith('bytes'):
+                lines.append('    {:<36} {:>10.0f} B'.format(case, value))
+            else:
+                lines.append('    {:<36} {:>10.3f} us'.format(case, value * 1e6))
+    return '\n'.join(lines)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m proxies.bench',
+            description='Benchmarks for the proxies hot paths.')
+    parser.add_argument('names', nargs='*', metavar='name',
+            help='benchmarks to run ({})'.format(', '.join(BENCHMARKS)))
+    parser.add_argument('--all', action='store_true', help='include slow benchmarks')
+    parser.add_argument('--format', choices=('json', 'text'), default='json')
+    parser.add_argument('-o', '--output', help='write the results to a file')
+    parser.add_argument('--repeat', type=int, default=None,
+            help='times to run each benchmark, results are the median (default 1, '
+            'or 5 with --compare)')
+    parser.add_argument('--compare', metavar='BASELINE',
+            help='compare with a stored results file and exit 1 on a regression')
+    parser.add_argument('--threshold', type=float, default=0.25,
+            help='fraction slower than the baseline that counts as a regression '
+            '(default 0.25)')
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if len(unknown) > 0:
+        parser.error('unknown benchmark: {}'.format(', '.join(unknown)))
+    if args.repeat is None:
+        args.repeat = 5 if args.compare else 1
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+    return args
+
+
+def main(argv=None):
+    """ Runs the benchmarks, returns the exit code (1 if --compare found a regression). """
+    if argv is None:
+        argv = sys.argv[1:]
+    args = parse_args(argv)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    samples = run_repeated(args.names, include_slow=args.all, repeat=args.repeat)
+    document = results_document(summarize(samples), samples)
+    if args.format == 'json':
+        output = json.dumps(document, indent=2)
+    else:
+        output = format_text(document['benchmarks'])
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    elif baseline is None:
+        print(output)
+
+    if baseline is not None:
+        comparison = compare(baseline, document, threshold=args.threshold)
+        print(format_comparison(comparison))
+        if any(item[-1] for item in comparison):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
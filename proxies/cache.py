@@ -0,0 +1,86 @@
+"""
+    proxies.cache
+    ~~~~~~~~~~~~~
+"""
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+class RenderCache:
+    """ An LRU cache for the output of BaseModelViewProxy.render.  Entries are keyed on
+        a (key, sub_key, context, cache_key, model_class) tuple, where the cache_key comes
+        from the context's cache_key method.  Once the cache holds :maxsize: entries the least
+        recently used entry get's evicted, and if a :ttl: (seconds) is given entries older
+        than that are treated as a miss and dropped.
+
+        Hit, miss, eviction and expiration counters are available through stats().
+
+        :ex:
+            >>> proxy = ModelViewProxy(Model, render_cache=RenderCache(maxsize=512, ttl=60))
+    """
+    def __init__(self, maxsize=128, ttl=None, timer=monotonic):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, cache_key, default=None):
+        """ Returns the cached value for :cache_key: or :default: on a miss. """
+        with self._lock:
+            try:
+                expires, value = self._entries[cache_key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires is not None and expires <= self.timer():
+                del self._entries[cache_key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return value
+
+    def set(self, cache_key, value):
+        expires = None
+        if self.ttl is not None:
+            expires = self.timer() + self.ttl
+        with self._lock:
+            self._entries[cache_key] = (expires, value)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key, sub_key=None):
+        """ Drop every entry for a key, or only the entries for key.sub_key. """
+        with self._lock:
+            stale = [cache_key for cache_key in self._entries if cache_key[0] == key and \
+                    (sub_key is None or cache_key[1] == sub_key)]
+            for cache_key in stale:
+                del self._entries[cache_key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """ Returns a dict of the counters, plus the current and max size. """
+        return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'size': len(self._entries),
+                'maxsize': self.maxsize }
+
+    def __len__(self):
+        return len(self._entries)
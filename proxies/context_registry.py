@@ -3,8 +3,12 @@
     ~~~~~~~~~~~~~~~~~~~~~~~~
 """
 from inspect import isclass
+from importlib import import_module
+from threading import Lock
 from collections import namedtuple
-from .core import BaseViewContext
+from collections.abc import Mapping
+from types import MappingProxyType
+from .core import BaseViewContext, FrozenError
 from .utils import TypeParser, get_first
 
 ContextContainer = namedtuple('Context', ['key', 'context'])
@@ -15,13 +19,139 @@ class InvalidContextError(TypeError):
         if text is None:
             text = 'context must inherit from BaseViewContext'
         super().__init__(text)
+
+
+class InvalidContextsError(InvalidContextError):
+    """ Raised when registering several contexts at once, with all of the errors.
+
+        :param errors:  A list of (name, InvalidContextError) tuples, where name is
+                        whatever the context was registered under.
+    """
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__('{} invalid context(s): {}'.format(len(self.errors),
+            '; '.join('{}: {}'.format(name, error) for name, error in self.errors)))
    
 get_first_string = get_first(TypeParser(str))
 
+def _is_valid_context(context):
+    """ helper to check that a context is BaseViewContext, a direct sub-class of it or
+        an instance of one.
+    """
+    if isclass(context):
+        return context is BaseViewContext or BaseViewContext in context.__bases__
+    return isinstance(context, BaseViewContext)
+
+
+def validate_contexts(items):
+    """ Validate (name, context) pairs for a bulk registration.  Each distinct context
+        is only validated once.  Returns a list of (name, context) pairs, where import
+        paths are turned into LazyContext's, or raises InvalidContextsError with every
+        invalid context.
+    """
+    # id(context) (or the import path) -> (context, error), the contexts are alive for
+    # the whole call so their ids stay unique.  Keying import paths on the string means
+    # a path registered several times get's one LazyContext, which is imported once.
+    seen = {}
+    rv = []
+    errors = []
+    for name, context in items:
+        seen_key = context if isinstance(context, str) else id(context)
+        validated = seen.get(seen_key)
+        if validated is None:
+            validated = seen[seen_key] = _validate_context(context)
+        context, error = validated
+        if error:
+            errors.append((name, error))
+        else:
+            rv.append((name, context))
+    if errors:
+        raise InvalidContextsError(errors)
+    return rv
+
+
+def _validate_context(context):
+    """ helper that returns a (context, error) tuple.  An import path string is
+        returned as a LazyContext, which get's validated when it's resolved.
+    """
+    error = None
+    if LazyContext.is_import_path(context):
+        try:
+            context = LazyContext(context)
+        except InvalidContextError as e:
+            error = e
+    elif not isinstance(context, LazyContext) and not _is_valid_context(context):
+        error = InvalidContextError()
+    return (context, error)
+
+
+class LazyContext:
+    """ A context registered by it's import path ('module:Class'), so the module does
+        not need to be imported until the context is used.  The context is imported and
+        validated the first time it's resolved, then cached.
+
+        :ex:
+            >>> registry['users'] = 'app.views.tables:UserTable'
+    """
+    __slots__ = ('path', 'module', 'qualname', '_context')
+
+    def __init__(self, path):
+        module, _, qualname = path.partition(':')
+        if not module or not qualname:
+            raise InvalidContextError("import path '{}' should be 'module:Class'"\
+                    .format(path))
+        self.path = path
+        self.module = module
+        self.qualname = qualname
+        self._context = None
+
+    @classmethod
+    def is_import_path(cls, context):
+        return isinstance(context, str) and ':' in context
+
+    @property
+    def resolved(self):
+        return self._context is not None
+
+    def resolve(self):
+        """ Import and validate the context, raises InvalidContextError if it can't be
+            imported or does not inherit from BaseViewContext.
+        """
+        if self._context is not None:
+            return self._context
+        try:
+            rv = import_module(self.module)
+            for name in self.qualname.split('.'):
+                rv = getattr(rv, name)
+        except (ImportError, AttributeError) as e:
+            raise InvalidContextError("could not import context '{}': {}"\
+                    .format(self.path, e)) from e
+        if not _is_valid_context(rv):
+            raise InvalidContextError("context '{}' must inherit from BaseViewContext"\
+                    .format(self.path))
+        self._context = rv
+        return rv
+
+    def __repr__(self):
+        return '<LazyContext: {}>'.format(self.path)
+
+
 class ContextRegistry:
+    """ Holds sub-key, context pairs for a key on a BaseModelViewProxy.  Contexts are
+        indexed by sub-key in a dict, so lookups do not depend on the number of
+        registered contexts, while keys() and values() still come back in registration
+        order.
+
+        The dict is copy-on-write.  Changes are made to a copy that then replaces the
+        old dict in one assignment, so readers in other threads never need a lock and
+        never see a half made change (ex. a replaced context missing).  Writers are
+        serialized with a lock.
+    """
 
     def __init__(self, *args, **kwargs):
-        self.contexts = []
+        self._lock = Lock()
+        self._contexts = {}
+        self.frozen = False
         
         key, context = self._parse_args(args, kwargs)
         if context is not None:
@@ -32,18 +162,73 @@ class ContextRegistry:
             if key is None:
                 key = 'default'
 
-            self.contexts.append(ContextContainer(key, context))
+            self._contexts = {key: context}
 
+    @property
+    def contexts(self):
+        """ A list of ContextContainer's in registration order.  This used to be the list
+            the contexts were kept in, now it's a new list on every read, so changing it
+            does not change the registry (use __setitem__ or update).  Contexts registered
+            by import path that are not resolved yet are in it as their LazyContext, reading
+            it does not import them.
+        """
+        return [ContextContainer(key, context) for key, context in self._contexts.items()]
     
     def _validate_context(self, context):
-        error = None
-        if isclass(context):
-            if not context is BaseViewContext and \
-                    BaseViewContext not in context.__bases__:
-                error = InvalidContextError()
-        elif not isinstance(context, BaseViewContext):
-            error = InvalidContextError()
-        return (context, error)
+        return _validate_context(context)
+
+    def _resolve(self, key, context):
+        """ helper to resolve a LazyContext, and replace it with the context it resolved
+            to so later lookups don't go through it.
+        """
+        rv = context.resolve()
+        with self._lock:
+            if not self.frozen and self._contexts.get(key) is context:
+                contexts = dict(self._contexts)
+                contexts[key] = rv
+                self._contexts = contexts
+        return rv
+
+    def freeze(self, preload=True):
+        """ Resolve every context and make the registry read-only, any change after
+            this raises FrozenError.  With :preload: False contexts registered by import
+            path are left to be resolved when they're first used.
+        """
+        if preload:
+            self.preload()
+        with self._lock:
+            self.frozen = True
+            self._contexts = MappingProxyType(dict(self._contexts))
+        return self
+
+    def copy(self):
+        """ Returns a new (not frozen) ContextRegistry with the same contexts. """
+        rv = self.__class__()
+        rv._contexts = dict(self._contexts)
+        return rv
+
+    def _check_frozen(self):
+        if self.frozen:
+            raise FrozenError('can not change a frozen ContextRegistry')
+
+    def preload(self):
+        """ Resolve every context registered by import path.  Returns the number of
+            contexts resolved.
+        """
+        lazy = [(key, context) for key, context in self._contexts.items() \
+                if isinstance(context, LazyContext)]
+        if len(lazy) == 0:
+            return 0
+        resolved = [(key, context, context.resolve()) for key, context in lazy]
+        # replace them all with one copy
+        with self._lock:
+            if not self.frozen:
+                contexts = dict(self._contexts)
+                for key, context, rv in resolved:
+                    if contexts.get(key) is context:
+                        contexts[key] = rv
+                self._contexts = contexts
+        return len(resolved)
 
     def _parse_args(self, args, kwargs):
         """ allows us to init class with args or kwargs. """
@@ -69,39 +254,86 @@ class ContextRegistry:
         return (key, context)
         
     def get(self, key, default=None):
-        try:
-            return next(item[1] for item in self.contexts if item[0] == key)
-        except StopIteration:
-            return default
+        rv = self._contexts.get(key, default)
+        if isinstance(rv, LazyContext):
+            return self._resolve(key, rv)
+        return rv
 
     def keys(self, r_type='tuple'):
         """ if r_type is None return a generator else return r_type. """
         r_type = { 'list': list, 'tuple': tuple }.get(r_type, r_type) 
-        rv = (item[0] for item in self.contexts)
+        rv = (key for key in self._contexts)
         if r_type is None:
             return rv
         return r_type(rv)
 
     def values(self, r_type='tuple'):
+        self.preload()
         r_type = { 'list': list, 'tuple': tuple }.get(r_type, r_type)
-        rv = (item[1] for item in self.contexts)
+        rv = (context for context in self._contexts.values())
         if r_type is None:
             return rv
         return r_type(rv)
 
+    def items(self, resolve=True):
+        """ Returns a list of (sub-key, context) pairs in registration order.  With
+            :resolve: False, contexts registered by import path are returned as their
+            LazyContext instead of being imported.
+        """
+        if resolve:
+            self.preload()
+        return list(self._contexts.items())
+
     def __setitem__(self, key, context):
         context, error = self._validate_context(context)
         if error:
             raise error
         
-        # should check if key exists first
-        if key in self.keys():
-            # deletw item by index if exists, bc we can't update a namedtuple, we must
-            # make a new one
-            del(self.contexts[self.contexts.index((key, self.get(key)))])
+        with self._lock:
+            self._check_frozen()
+            contexts = dict(self._contexts)
+            # a replaced key moves to the end, same as registering it for the first time
+            contexts.pop(key, None)
+            contexts[key] = context
+            self._contexts = contexts
+
+    def update(self, contexts, validate=True):
+        """ Register several sub-key, context pairs with one copy of the dict.  Nothing
+            is registered if any context is invalid.
+
+            :param contexts:    A mapping or iterable of (sub-key, context) pairs.
+            :param validate:    Set to False if the contexts already went through
+                                validate_contexts.
+        """
+        if isinstance(contexts, Mapping):
+            contexts = contexts.items()
+        if validate:
+            contexts = validate_contexts(contexts)
+        with self._lock:
+            self._check_frozen()
+            updated = dict(self._contexts)
+            for key, context in contexts:
+                updated.pop(key, None)
+                updated[key] = context
+            self._contexts = updated
+        return self
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._check_frozen()
+            contexts = dict(self._contexts)
+            del contexts[key]
+            self._contexts = contexts
+
+    def __contains__(self, key):
+        return key in self._contexts
 
-        self.contexts.append(ContextContainer(key, context))
+    def __len__(self):
+        return len(self._contexts)
 
+    def __bool__(self):
+        # a registry is truthy even with no contexts (as it was before it had a __len__)
+        return True
 
     def __getitem__(self, key):
         rv = self.get(key)
@@ -110,6 +342,9 @@ class ContextRegistry:
         raise KeyError(key)
 
     def __getattr__(self, key):
+        if key.startswith('_'):
+            # don't look up private attributes in the contexts (ex. before __init__)
+            raise AttributeError(key)
         rv = self.get(key)
         if rv is not None:
             return rv
@@ -14,6 +14,32 @@ class BaseDict(dict):
         super().update(*args, **kwargs)
         return self
 
+
+class FrozenError(TypeError):
+    """ Raised when trying to change something that has been frozen. """
+
+    def __init__(self, text=None):
+        if text is None:
+            text = 'can not change a frozen proxy'
+        super().__init__(text)
+
+
+class FrozenDict(BaseDict):
+    """ A BaseDict that raises FrozenError on any change. """
+
+    def _frozen(self, *args, **kwargs):
+        raise FrozenError()
+
+    __setitem__ = __delitem__ = __ior__ = _frozen
+    update = setdefault = pop = popitem = clear = _frozen
+
+    def copy(self):
+        return FrozenDict(self)
+
+    def __reduce__(self):
+        # pickle's default for a dict sub-class set's the items one at a time
+        return (self.__class__, (dict(self),))
+
 class BaseChainMap(ChainMap):
 
     def update(self, *args, **kwargs):
@@ -23,6 +49,9 @@ class BaseChainMap(ChainMap):
 
 class BaseViewContext:
     label_order = {}
+    # set to False on a context that should never have it's output cached by
+    # a proxy's render_cache, ex. a registered instance that keeps state between renders.
+    cacheable = True
 
     def __init__(self, *, model=None, labels=None, label_order=None):
         if label_order is not None:
@@ -42,6 +71,43 @@ class BaseViewContext:
         raise NotImplementedError('render method not implemented for {}'\
                 .format(self.__class__.__name__))
 
+    def render_iter(self, *args, **kwargs):
+        """ Yields the rendered output in chunks.  The default yields the output of render
+            as one chunk, override it on contexts with large output (ex. tables with
+            a lot of rows) so the whole document is never held in memory at once.
+        """
+        yield self.render(*args, **kwargs)
+
+    def render_rows(self, rows, *args, **kwargs):
+        """ Renders the fragment of output for a chunk of :rows:.  Needed for a context to
+            be used with BaseModelViewProxy.render_parallel, which calls it in worker
+            processes, so it should only depend on model, labels and it's arguments.
+        """
+        raise NotImplementedError('render_rows method not implemented for {}'\
+                .format(self.__class__.__name__))
+
+    def join_fragments(self, fragments, *args, **kwargs):
+        """ Joins the fragments from render_rows (in row order) into the final output.
+            Override to wrap them (ex. in a table tag).
+        """
+        return ''.join(fragments)
+
+    def reset(self):
+        """ Called when a proxy with a context_pool is done rendering this instance, before
+            it get's reused for another render.  Override to clear any state set during
+            render.
+        """
+        pass
+
+    @classmethod
+    def cache_key(cls, *args, **kwargs):
+        """ Returns the part of a render cache key that comes from the args and kwargs
+            passed to render.  Override to key on something else (a user's role,
+            a last modified timestamp, etc.) or return None to skip the cache for a
+            call.
+        """
+        return (args, tuple(sorted(kwargs.items())))
+
 
 class BaseErrorHandler:
 
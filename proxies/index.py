@@ -0,0 +1,150 @@
+"""
+    proxies.index
+    ~~~~~~~~~~~~~
+
+        A process wide index of proxies, by model class and by model name, so there's
+        one proxy per model and a request can be routed to the right proxy with a
+        'Model.key.sub-key' string.
+
+        Model classes and names map to their proxy weakly, so the index does not keep
+        dynamically made model classes alive.  Since a proxy references it's model
+        class, it can't be kept alive by the index either, it's kept alive by the
+        model's labels instead (the SchemaMap SchemaLabelMeta made for the class).
+        Nothing get's set on the model class itself.
+
+        :ex:
+            >>> proxy = get_proxy(User)
+            >>> proxy.register_context('table', 'default', UserTable)
+            >>> get_proxy(User) is proxy
+            True
+            >>> render('User.table.default', rows)
+"""
+from threading import Lock
+from weakref import WeakKeyDictionary, WeakValueDictionary, ref
+
+from .model_view import ModelViewProxy
+from .schema_helper import SchemaLabelMeta, SchemaLabelProtocol
+
+# name of the attribute on a model's labels that holds it's proxy
+PROXY_ATTR = '_indexed_proxy'
+
+# model class -> weak reference to it's proxy
+_proxies = WeakKeyDictionary()
+# model name -> model class
+_models = WeakValueDictionary()
+_lock = Lock()
+
+def _model_class(model):
+    """ helper to get the class of a model class or instance. """
+    if isinstance(model, SchemaLabelMeta):
+        return model
+    return model.__class__
+
+
+def get_proxy(model, name=None, proxy_class=ModelViewProxy, **kwargs):
+    """ Returns the proxy for :model: (a class or instance), making it the first time
+        with proxy_class(model, **kwargs) and indexing it under :name: (the class name
+        if None).  Later calls return the same proxy and ignore the other arguments.
+        Raises TypeError if :model: does not implement SchemaLabelProtocol.
+    """
+    if not isinstance(model, (SchemaLabelMeta, SchemaLabelProtocol)):
+        raise TypeError("'{}' does not implement SchemaLabelProtocol".format(
+            getattr(model, '__name__', model.__class__.__name__)))
+    rv = lookup(model)
+    if rv is not None:
+        return rv
+    model_class = _model_class(model)
+    with _lock:
+        rv = _get(model_class)
+        if rv is None:
+            rv = proxy_class(model, **kwargs)
+            _index(rv, model_class, name)
+    return rv
+
+
+def register_proxy(proxy, name=None):
+    """ Add an already made proxy to the index, under :name: (the class name if None).
+        Raises ValueError if the model already has a different proxy.
+    """
+    with _lock:
+        current = _get(proxy.model_class)
+        if current is not None and current is not proxy:
+            raise ValueError("model '{}' already has a proxy".format(
+                proxy.model_class.__name__))
+        _index(proxy, proxy.model_class, name)
+    return proxy
+
+
+def _get(model_class):
+    """ helper to get the proxy of a model class, or None. """
+    proxy_ref = _proxies.get(model_class)
+    if proxy_ref is None:
+        return None
+    return proxy_ref()
+
+
+def _index(proxy, model_class, name):
+    """ helper to index a proxy, should be called with the lock held. """
+    if name is None:
+        name = model_class.__name__
+    current = _models.get(name)
+    if current is not None and current is not model_class:
+        raise ValueError("model name '{}' is already used by {}.{}, pass in a name"\
+                .format(name, current.__module__, current.__qualname__))
+    # by exact class, so sub-classes don't find their parent's proxy
+    _proxies[model_class] = ref(proxy)
+    # keeps the proxy alive for as long as the model's labels are
+    setattr(model_class.labels, PROXY_ATTR, proxy)
+    _models[name] = model_class
+
+
+def lookup(model):
+    """ Returns the proxy for a model class, instance or name, or None. """
+    if isinstance(model, str):
+        model = _models.get(model)
+        if model is None:
+            return None
+    return _get(_model_class(model))
+
+
+def route(path):
+    """ Split a 'Model.key.sub-key' (or 'Model.key') path, returning a (proxy, context)
+        tuple where context is the rest of the path to render with the proxy.  Raises
+        KeyError for an unknown model name.
+    """
+    name, _, context = path.partition('.')
+    if not context:
+        raise ValueError("path '{}' should be 'Model.key.sub-key'".format(path))
+    proxy = lookup(name)
+    if proxy is None:
+        raise KeyError(name)
+    return (proxy, context)
+
+
+def render(path, *args, **kwargs):
+    """ Render a 'Model.key.sub-key' path with the model's proxy. """
+    proxy, context = route(path)
+    return proxy.render(context, *args, **kwargs)
+
+
+def models():
+    """ Returns a dict of model name -> model class for the indexed models. """
+    return dict(_models.items())
+
+
+def remove(model):
+    """ Remove a model (class, instance or name) and it's proxy from the index. """
+    with _lock:
+        if isinstance(model, str):
+            model_class = _models.pop(model, None)
+        else:
+            model_class = _model_class(model)
+            for name, cls in list(_models.items()):
+                if cls is model_class:
+                    del _models[name]
+        if model_class is not None:
+            proxy = _get(model_class)
+            _proxies.pop(model_class, None)
+            labels = getattr(model_class, 'labels', None)
+            if proxy is not None and getattr(labels, PROXY_ATTR, None) is proxy:
+                delattr(labels, PROXY_ATTR)
@@ -0,0 +1,182 @@
+"""
+    proxies.metrics
+    ~~~~~~~~~~~~~~~
+
+        Exports metrics for every ModelViewProxy in the process in the Prometheus text
+        exposition format.  Render timings are only there for proxies with
+        collect_stats turned on, and cache metrics for proxies with a render_cache.
+
+        :ex:
+            >>> print(generate_text())
+            >>> write_textfile('/var/lib/node_exporter/textfile/proxies.prom')
+            >>> server = serve(9180)
+"""
+import os
+import tempfile
+from threading import Thread
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from .model_view import model_view_proxies, qualified_name
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+class Metric:
+    """ A metric family, samples with the same label values get added together. """
+
+    def __init__(self, name, type, help):
+        self.name = name
+        self.type = type
+        self.help = help
+        # (suffix, label items) -> value
+        self.samples = OrderedDict()
+
+    def add(self, value, suffix='', **labels):
+        key = (suffix, tuple(labels.items()))
+        self.samples[key] = self.samples.get(key, 0) + value
+
+    def set_max(self, value, suffix='', **labels):
+        key = (suffix, tuple(labels.items()))
+        self.samples[key] = max(self.samples.get(key, value), value)
+
+    def lines(self):
+        yield '# HELP {} {}'.format(self.name, self.help)
+        yield '# TYPE {} {}'.format(self.name, self.type)
+        for (suffix, labels), value in self.samples.items():
+            yield '{}{}{} {}'.format(self.name, suffix, _format_labels(labels),
+                    _format_value(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if len(labels) == 0:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(k, _escape(v)) for k, v in labels) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def collect(proxies=None):
+    """ Returns a list of Metric's aggregated over :proxies: (every ModelViewProxy in
+        the process if None).  Proxies for the same model class get added together,
+        and a render cache shared by several proxies is only counted once.
+    """
+    if proxies is None:
+        proxies = model_view_proxies()
+
+    seconds = Metric('proxies_render_seconds', 'histogram',
+            'Time spent rendering (method="render") or initializing (method="init_context") '
+            'contexts.')
+    max_seconds = Metric('proxies_render_max_seconds', 'gauge',
+            'Slowest render or init_context seen.')
+    errors = Metric('proxies_errors_total', 'counter',
+            'Errors passed to the error handler, by exception type.')
+    contexts = Metric('proxies_registry_contexts', 'gauge',
+            'Contexts registered per key.')
+    cache_hits = Metric('proxies_render_cache_hits_total', 'counter', 'Render cache hits.')
+    cache_misses = Metric('proxies_render_cache_misses_total', 'counter',
+            'Render cache misses.')
+    cache_evictions = Metric('proxies_render_cache_evictions_total', 'counter',
+            'Render cache entries evicted to stay under maxsize, or expired.')
+    cache_size = Metric('proxies_render_cache_entries', 'gauge', 'Render cache entries.')
+    cache_ratio = Metric('proxies_render_cache_hit_ratio', 'gauge',
+            'Render cache hits / (hits + misses).')
+
+    seen_caches = set()
+    for proxy in proxies:
+        model = qualified_name(proxy.model_class)
+        for method, names in proxy.stats().items():
+            for name, stat in names.items():
+                labels = OrderedDict([('model', model), ('context', name), ('method', method)])
+                cumulative = 0
+                for bound, count in stat['histogram']:
+                    cumulative += count
+                    le = '+Inf' if bound is None else _format_value(float(bound))
+                    seconds.add(cumulative, '_bucket', **labels, le=le)
+                seconds.add(stat['total'], '_sum', **labels)
+                seconds.add(stat['count'], '_count', **labels)
+                max_seconds.set_max(stat['max'], **labels)
+
+        for exception, count in sorted(getattr(proxy, 'error_counts', {}).items()):
+            errors.add(count, model=model, exception=exception)
+
+        for key, registry in proxy.registerys.items():
+            contexts.add(len(registry), model=model, key=key)
+
+        cache = proxy.render_cache
+        if cache is not None and id(cache) not in seen_caches:
+            seen_caches.add(id(cache))
+            stats = cache.stats()
+            cache_hits.add(stats['hits'], model=model)
+            cache_misses.add(stats['misses'], model=model)
+            cache_evictions.add(stats['evictions'], model=model, reason='size')
+            cache_evictions.add(stats.get('expirations', 0), model=model, reason='ttl')
+            cache_size.add(stats['size'], model=model)
+
+    # hit ratios come from the aggregated counters
+    for (suffix, labels), hits in cache_hits.samples.items():
+        total = hits + cache_misses.samples.get((suffix, labels), 0)
+        cache_ratio.add(hits / total if total else 0.0, **OrderedDict(labels))
+
+    return [seconds, max_seconds, errors, contexts, cache_hits, cache_misses,
+            cache_evictions, cache_size, cache_ratio]
+
+
+def generate_text(proxies=None):
+    """ Returns the metrics in the Prometheus text exposition format. """
+    lines = []
+    for metric in collect(proxies):
+        if len(metric.samples) > 0:
+            lines.extend(metric.lines())
+    return '\n'.join(lines) + '\n'
+
+
+def write_textfile(path, proxies=None):
+    """ Write the metrics to :path: for the node exporter's textfile collector.  The file
+        is written next to :path: and then renamed, so the collector never reads half
+        a file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.proxies', suffix='.prom.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(generate_text(proxies))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """ Serves generate_text on every GET path. """
+
+    def do_GET(self):
+        body = generate_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, address='127.0.0.1'):
+    """ Serve the metrics over HTTP from a daemon thread.  Returns the server, call it's
+        shutdown method to stop it.
+    """
+    server = HTTPServer((address, port), MetricsHandler)
+    thread = Thread(target=server.serve_forever, name='proxies-metrics', daemon=True)
+    thread.start()
+    return server
@@ -2,14 +2,53 @@
     proxies.model_view
     ~~~~~~~~~~~~~~~~~~
 """
-from inspect import isclass
-from .core import BaseViewContext, BaseDict, BaseErrorHandler
+import asyncio
+import contextvars
+from hashlib import blake2b
+from concurrent.futures import ProcessPoolExecutor
+from collections.abc import Mapping
+from functools import partial
+from itertools import islice, repeat
+from threading import Lock
+from weakref import WeakSet
+from time import perf_counter
+from inspect import isclass, iscoroutinefunction
+from .core import BaseViewContext, BaseDict, BaseErrorHandler, FrozenDict, FrozenError
 from .schema_helper import SchemaLabelMeta, SchemaLabelProtocol
-from .utils import TypeParser
-from .context_registry import ContextRegistry, InvalidContextError
+from .utils import TypeParser, OrderedLabels
+from .context_registry import ContextRegistry, InvalidContextError, LazyContext, \
+        validate_contexts
+from .stats import RenderStats
+from . import tracing
 
 get_strings = TypeParser(str)
 
+# sentinel for a render cache miss, since a context could render None
+_missing = object()
+
+# every ModelViewProxy in the process, for exporting metrics (see proxies.metrics)
+_model_view_proxies = WeakSet()
+
+def model_view_proxies():
+    """ Returns a list of the ModelViewProxy instances that are alive in this process. """
+    return list(_model_view_proxies)
+
+
+def qualified_name(cls):
+    """ helper to get the 'module.QualName' of a class, used to name models. """
+    return '{}.{}'.format(cls.__module__, cls.__qualname__)
+
+
+def _context_name(key, sub_key, context):
+    """ helper to name a resolved context for stats and tracing, key.sub-key or the
+        context's class name if it was not rendered by key.
+    """
+    if key is not None:
+        return '{}.{}'.format(key, sub_key)
+    if isclass(context):
+        return context.__name__
+    return context.__class__.__name__
+
 class BaseModelViewProxy:
     """ This is the main object that we interact with.  We can register views and group
         by keys and a sub-key for the view, which allows us to have similar view groups
@@ -27,9 +66,32 @@ class BaseModelViewProxy:
         little bit different set-up then it can be done easily. The render method does not
         have to render a view that is registered with this instance, it can also accept
         an instance of view context and render it with the passed in args and kwargs.
+
+        Passing a RenderCache as :render_cache: caches the output of string (key.sub-key)
+        renders, keyed on the labels too.  Contexts can opt out with cacheable = False or
+        by returning None from their cache_key method.  That includes registered context
+        instances that keep state between renders (ex. a counter), an instance is
+        cacheable like it's class, and would get the first output on every render.
+
+        Passing a ContextPool as :context_pool: reuses instances of registered context
+        classes in render instead of instantiating them on every call.
+
+        Registering is safe while other threads render.  Both registerys and every
+        ContextRegistry are replaced with an updated copy instead of being changed in
+        place, so renders never take a lock.
+
+        With :collect_stats: set to True (it can be changed at any time) render,
+        renderers from get_renderer and init_context record timings per key.sub-key,
+        which are available from stats().
+
+        Passing a RenderProfiler (see proxies.profiling) as :profiler: captures cProfile
+        data for slow or sampled renders.
+
+        Once everything is registered a proxy can be frozen, see freeze.
     """
 
-    def __init__(self, model_class, *args, **kwargs):
+    def __init__(self, model_class, *args, render_cache=None, context_pool=None,
+            collect_stats=False, profiler=None, **kwargs):
         if not isinstance(model_class, (SchemaLabelMeta, SchemaLabelProtocol)):
             if isclass(model_class):
                 name = model_class.__name__
@@ -45,6 +107,23 @@ class BaseModelViewProxy:
 
         self.labels = self.model_class.labels
         self.registerys = BaseDict()
+        self._lock = Lock()
+        self.render_cache = render_cache
+        self.context_pool = context_pool
+        self._pooled_labels = None
+        # (flattened labels, digest of them) for render cache keys
+        self._cached_labels_digest = None
+        self.collect_stats = collect_stats
+        self.render_stats = RenderStats()
+        self.profiler = profiler
+        # bumped on every registration, so a ContextRenderer knows to resolve again
+        self._generation = 0
+        self.frozen = False
+        # set by freeze, 'key' and 'key.sub-key' -> (key, sub-key, context)
+        self._resolved = None
+        self._frozen_labels = None
+        # context class -> OrderedLabels in the class's label_order
+        self._ordered_labels = None
         
     def register_context(self, key, sub_key, context):
         """ Register a sub-context with an existing registry or create a new registry if
@@ -53,17 +132,140 @@ class BaseModelViewProxy:
             :param key:         The key for an existing registry or key for a new registry.
             :param sub_key:     The sub-key for the context being registered. 
             :param context:     The context to be registered.  Will raise InvalidContextError
-                                if the context does not inherit from BaseViewContext.
+                                if the context does not inherit from BaseViewContext.  Can
+                                also be an import path ('module:Class'), in which case the
+                                context is not imported (or validated) until it's first
+                                used, see preload.
             :returns:           None
         """
         # :TODO: these could raise an InvalidContextError if context is invalid type,
         #        so should register with an error handler when I get that done
-        if key in self.registerys:
-            self.registerys[key][sub_key] = context
-        else:
-            self.registerys[key] = ContextRegistry(sub_key, context)
-        
+        with self._lock:
+            if self.frozen:
+                raise FrozenError()
+            registry = self.registerys.get(key)
+            if registry is not None:
+                registry[sub_key] = context
+            else:
+                registry = ContextRegistry(sub_key, context)
+                self.registerys = BaseDict(self.registerys).update({key: registry})
+            self._generation += 1
+
+        if self._invalidate_on_register():
+            self.render_cache.invalidate(key, sub_key)
+        if self.context_pool is not None:
+            self.context_pool.clear()
+
     
+    def register_contexts(self, contexts):
+        """ Register a lot of contexts at once.  Each distinct context is validated once
+            and every registry is updated in one pass.  It's all or nothing, if any
+            context is invalid an InvalidContextsError with all of the errors is raised
+            and nothing get's registered.  The registry of every key registered to is
+            replaced with an updated copy, so other threads see all of the changes at once.
+
+            :param contexts:    A mapping of {key: {sub-key: context}}, or of
+                                {'key.sub-key': context} ('key' alone registers the
+                                context as the default), the two can be mixed.
+
+            :ex:
+                >>> proxy.register_contexts({
+                ...     'table': {'default': Table, 'responsive': ResponsiveTable},
+                ...     'form.default': 'app.views.forms:UserForm' })
+        """
+        items = []
+        for key, value in contexts.items():
+            if isinstance(value, Mapping):
+                items.extend(((key, sub_key), context) for sub_key, context in value.items())
+            else:
+                key, _, sub_key = key.partition('.')
+                items.append(((key, sub_key or 'default'), value))
+        validated = validate_contexts(items)
+
+        by_key = {}
+        for (key, sub_key), context in validated:
+            by_key.setdefault(key, []).append((sub_key, context))
+
+        with self._lock:
+            if self.frozen:
+                raise FrozenError()
+            # registries are updated as copies, so readers see the changes to every key at
+            # once when registerys is replaced
+            registerys = BaseDict(self.registerys)
+            for key, key_contexts in by_key.items():
+                registry = registerys.get(key)
+                registry = ContextRegistry() if registry is None else registry.copy()
+                registerys[key] = registry.update(key_contexts, validate=False)
+            self.registerys = registerys
+            self._generation += 1
+
+        if self._invalidate_on_register():
+            for key in by_key:
+                self.render_cache.invalidate(key)
+        if self.context_pool is not None:
+            self.context_pool.clear()
+
+    def freeze(self, preload=True):
+        """ Compile the proxy into a read-only form, for when nothing else is going to
+            get registered (ex. after start up).  Every context registered by import path
+            is resolved, registerys and every ContextRegistry become read-only, and any
+            registration after this raises FrozenError.
+
+            Renders of a 'key' or 'key.sub-key' string then resolve the context with one
+            dict lookup, contexts get the labels as they were when the proxy was frozen
+            (flattened from the model's SchemaMap) and context classes get an
+            OrderedLabels that is built once per class, the first time it's rendered.
+
+            :param preload:     Set to False to leave contexts registered by import path
+                                to be imported the first time they're rendered (ex. a
+                                worker loading a snapshot, see proxies.snapshot).
+
+            :returns:   self
+        """
+        while True:
+            if preload:
+                # imported outside the lock, a module could register contexts with this
+                # proxy when it get's imported
+                BaseModelViewProxy.preload(self)
+            with self._lock:
+                if self.frozen:
+                    return self
+                # unless more got registered by import path while preloading
+                if not preload or not self._has_lazy_contexts():
+                    self._freeze()
+                    return self
+
+    def _freeze(self):
+        """ helper to freeze the proxy, called with the lock held. """
+        registerys = FrozenDict((key, registry.freeze(preload=False)) \
+                for key, registry in self.registerys.items())
+
+        resolved = {}
+        for key, registry in registerys.items():
+            for sub_key, context in registry.items(resolve=False):
+                resolved['{}.{}'.format(key, sub_key)] = (key, sub_key, context)
+                if sub_key == 'default':
+                    resolved[key] = (key, sub_key, context)
+
+        self.registerys = registerys
+        self._resolved = resolved
+        self._frozen_labels = self.labels.snapshot()
+        self._ordered_labels = {}
+        self.frozen = True
+        self._generation += 1
+
+    def _has_lazy_contexts(self):
+        """ helper to check if any context registered by import path is not resolved. """
+        return any(isinstance(context, LazyContext) and not context.resolved \
+                for registry in self.registerys.values() \
+                for _, context in registry.items(resolve=False))
+
+    def preload(self):
+        """ Import and validate every context registered by import path, ex. before
+            forking workers.  Returns the number of contexts that got resolved.
+        """
+        return sum(registry.preload() for registry in self.registerys.values())
+
     def _get_context_keys(self, args):
         """ helper to parse args into key, sub-key, error tuple. """
         key = None
@@ -121,11 +323,26 @@ class BaseModelViewProxy:
         
             :returns:   A new instance of the context asked for 
         """
+        if self.collect_stats:
+            start = perf_counter()
+            try:
+                return self._init_context(key, sub_context, args, kwargs)
+            finally:
+                self.render_stats.record('init_context', '{}.{}'.format(key, sub_context),
+                        perf_counter() - start)
+        return self._init_context(key, sub_context, args, kwargs)
+
+    def _init_context(self, key, sub_context, args, kwargs):
         context_class = self.get_context(key, sub_context)
         if not isclass(context_class):
             context_class = context_class.__class__
 
-        kwargs.update({'model': self.model_class, 'labels': self.labels})
+        if 'label_order' in kwargs:
+            # the cached OrderedLabels are in the class's order
+            labels = self._flat_labels()
+        else:
+            labels = self._context_labels(context_class)
+        kwargs.update({'model': self.model_class, 'labels': labels})
         context = context_class(*args, **kwargs)
         return context
 
@@ -144,7 +361,204 @@ class BaseModelViewProxy:
             :returns:           A markupsafe string to be used as a view or context for
                                 an html body.
         """
+        key, sub_key, context = self._resolve_context(context)
+        return self._render_resolved(key, sub_key, context, args, kwargs)
+
+    def render_iter(self, context, *args, **kwargs):
+        """ Same as render, but returns an iterator of string chunks from the context's
+            render_iter method, which can be returned as is from a WSGI app.  Streamed
+            output does not go through the render cache.
+
+            :returns:           An iterator of strings.
+        """
+        key, sub_key, context = self._resolve_context(context)
+        if isclass(context):
+            context = context(**{'model': self.model_class,
+                'labels': self._context_labels(context)})
+        return iter(context.render_iter(*args, **kwargs))
+
+    async def arender(self, context, *args, **kwargs):
+        """ The asyncio version of render.  Contexts with an async def render method get
+            awaited, while a regular render method is run in the event loop's default
+            executor so it does not block the loop.  Goes through the render cache the
+            same as render.
+        """
+        key, sub_key, context = self._resolve_context(context)
+        if tracing.active:
+            started = tracing.start_span(qualified_name(self.model_class), key, sub_key,
+                    _context_name(key, sub_key, context))
+            if started is not None:
+                try:
+                    return await self._arender_resolved(key, sub_key, context, args, kwargs)
+                finally:
+                    tracing.end_span(started)
+        return await self._arender_resolved(key, sub_key, context, args, kwargs)
+
+    async def _arender_resolved(self, key, sub_key, context, args, kwargs):
+        cache_key = None
+        if self.render_cache is not None and key is not None:
+            cache_key = self._render_cache_key(key, sub_key, context, args, kwargs)
+            if cache_key is not None:
+                rv = self.render_cache.get(cache_key, _missing)
+                if rv is not _missing:
+                    return rv
+
+        if isclass(context):
+            context = context(**{'model': self.model_class,
+                'labels': self._context_labels(context)})
+        if iscoroutinefunction(context.render):
+            rv = await context.render(*args, **kwargs)
+        else:
+            # run in a copy of our context, so spans of nested renders end up in the trace
+            loop = asyncio.get_running_loop()
+            rv = await loop.run_in_executor(None, contextvars.copy_context().run,
+                    partial(context.render, *args, **kwargs))
+
+        if cache_key is not None:
+            self.render_cache.set(cache_key, rv)
+        return rv
+
+    async def arender_all(self, *contexts):
+        """ Render several contexts concurrently (ex. the parts of one page).
+
+            :param contexts:    Each can be anything render accepts as a context, or a
+                                (context, args) or (context, args, kwargs) tuple.
+
+            :returns:           A list of the rendered contexts, in the order passed in.
+            :raises TypeError:  If a tuple is not one of those, before anything is
+                                rendered.
+        """
+        specs = []
+        for context in contexts:
+            args = ()
+            kwargs = {}
+            if isinstance(context, tuple):
+                if len(context) == 3:
+                    context, args, kwargs = context
+                elif len(context) == 2:
+                    context, args = context
+                else:
+                    raise TypeError('{!r} should be a (context, args) or (context, args, '
+                            'kwargs) tuple'.format(context))
+            specs.append((context, args, kwargs))
+        calls = [self.arender(context, *args, **kwargs) for context, args, kwargs in specs]
+        return list(await asyncio.gather(*calls))
+
+    def render_parallel(self, context, rows, *args, chunk_size=1000, executor=None,
+            max_workers=None, **kwargs):
+        """ Render a context that implements render_rows by splitting :rows: into chunks,
+            rendering each chunk in a worker process and joining the fragments in order
+            with the context's join_fragments.
+
+            The context (class or instance), model class, rows and args get pickled to the
+            workers, so they need to be picklable (classes defined at module level).
+            The labels are sent as a plain dict.
+
+            :param chunk_size:  The number of rows rendered per worker call, raises
+                                ValueError if it's less than 1.
+            :param executor:    An executor to use (ex. a long lived ProcessPoolExecutor),
+                                if None a ProcessPoolExecutor with :max_workers: get's made
+                                for this call.
+        """
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be at least 1, not {}'.format(chunk_size))
+        key, sub_key, context = self._resolve_context(context)
+        labels = dict(self._flat_labels())
+        rows = iter(rows)
+        chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+        render_args = (repeat(context), repeat(self.model_class), repeat(labels), chunks,
+                repeat(args), repeat(kwargs))
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                fragments = list(executor.map(_render_rows, *render_args))
+        else:
+            fragments = list(executor.map(_render_rows, *render_args))
+
+        if isclass(context):
+            context = context(**{'model': self.model_class, 'labels': labels})
+        return context.join_fragments(fragments, *args, **kwargs)
+
+    def get_renderer(self, context):
+        """ Resolve a context once and return a callable that renders it.  Accepts the
+            same context argument as render.  Calling the returned ContextRenderer with
+            args and kwargs is the same as calling render(context, *args, **kwargs),
+            without parsing the key.sub-key string and looking up the registry on every
+            call.  If the context get's re-registered, the renderer resolves it again
+            on it's next call.
+
+            :ex:
+                >>> render_table = proxy.get_renderer('table.default')
+                >>> render_table(rows)
+        """
+        return ContextRenderer(self, context)
+
+    def stats(self):
+        """ Returns the timings recorded while collect_stats is True, as
+            {'render': {name: stats}, 'init_context': {name: stats}}.  Names are
+            key.sub-key, or the context's class name if it was not rendered by key.
+            See RenderStats.as_dict for the stats.
+        """
+        return self.render_stats.as_dict()
+
+    def reset_stats(self):
+        self.render_stats.reset()
+
+    def _render_resolved(self, key, sub_key, context, args, kwargs, _timed=False):
+        """ helper to render an already resolved context, going through the render cache
+            if there is one.
+        """
+        if (self.collect_stats or tracing.active or self.profiler is not None) and \
+                not _timed:
+            return self._render_timed(key, sub_key, context, args, kwargs)
+        if self.render_cache is None or key is None:
+            return self._render_context(context, args, kwargs)
+
+        cache_key = self._render_cache_key(key, sub_key, context, args, kwargs)
+        if cache_key is None:
+            return self._render_context(context, args, kwargs)
+        rv = self.render_cache.get(cache_key, _missing)
+        if rv is _missing:
+            rv = self._render_context(context, args, kwargs)
+            self.render_cache.set(cache_key, rv)
+        return rv
+
+    def _render_timed(self, key, sub_key, context, args, kwargs):
+        """ helper to record how long _render_resolved takes in the stats, a span if
+            inside a trace, and to pass the render through the profiler if there is one.
+        """
+        name = _context_name(key, sub_key, context)
+        started = None
+        if tracing.active:
+            started = tracing.start_span(qualified_name(self.model_class), key, sub_key, name)
+        start = perf_counter()
+        try:
+            if self.profiler is not None:
+                return self.profiler.call(qualified_name(self.model_class), name,
+                        self._render_resolved, key, sub_key, context, args, kwargs,
+                        _timed=True)
+            return self._render_resolved(key, sub_key, context, args, kwargs, _timed=True)
+        finally:
+            if self.collect_stats:
+                self.render_stats.record('render', name, perf_counter() - start)
+            if started is not None:
+                tracing.end_span(started)
+
+    def _resolve_context(self, context):
+        """ helper to resolve what was passed to render into a (key, sub-key, context)
+            tuple.  Key and sub-key are None unless context is a key.sub-key string.
+            Lookup errors are raised, not passed to a sub-class's error handler, so the
+            caller's error handling only sees them once.
+        """
+        key = None
+        sub_key = None
         if isinstance(context, str):
+            if self._resolved is not None:
+                rv = self._resolved.get(context)
+                if rv is not None:
+                    if isinstance(rv[2], LazyContext):
+                        # frozen without preloading, import it on first use
+                        rv = self._resolved[context] = rv[:2] + (rv[2].resolve(),)
+                    return rv
             key, sub_key, error = self._get_context_keys(context)
             if error:
                 raise error
@@ -152,57 +566,270 @@ class BaseModelViewProxy:
             if key is not None and key in self.registerys:
                 if sub_key is not None:
                     try:
-                        context = self.get_context(key, sub_key)
+                        context = BaseModelViewProxy.get_context(self, key, sub_key)
                     except KeyError as e:
                         # should make a sub-key error object
                         raise e
                 else:
+                    sub_key = 'default'
                     try:
-                        context = self.get_context(key, 'default')
+                        context = BaseModelViewProxy.get_context(self, key, sub_key)
                     except KeyError:
                         raise ValueError('invalid sub-key and no default registered')
             elif key is not None:
                 raise KeyError(key)
+        return (key, sub_key, context)
 
+    def _invalidate_on_register(self):
+        """ helper to check if registering should invalidate the render cache, caches
+            shared with other processes opt out (see SharedRenderCache).
+        """
+        return self.render_cache is not None and \
+                getattr(self.render_cache, 'invalidate_on_register', True)
+
+    def _flat_labels(self):
+        """ helper to get the flattened labels, as they were when frozen if frozen. """
+        if self._frozen_labels is not None:
+            return self._frozen_labels
+        return self.labels.snapshot()
+
+    def _context_labels(self, context_class):
+        """ helper to get the labels to instantiate a context class with. """
+        ordered_labels = self._ordered_labels
+        if ordered_labels is not None:
+            rv = ordered_labels.get(context_class)
+            if rv is None:
+                # frozen, built the first time the class is rendered
+                rv = ordered_labels[context_class] = OrderedLabels(self._frozen_labels,
+                        context_class.label_order)
+            return rv
+        return self._flat_labels()
+
+    def _render_context(self, context, args, kwargs):
+        """ helper to instantiate a context class if needed and call it's render method. """
         if isclass(context):
-            context = context(**{'model': self.model_class, 'labels': self.labels})
+            if self.context_pool is not None:
+                return self._render_pooled(context, args, kwargs)
+            context = context(**{'model': self.model_class,
+                'labels': self._context_labels(context)})
         return context.render(*args, **kwargs)
 
+    def _render_pooled(self, context_class, args, kwargs):
+        """ helper to render a context class with an instance from the context pool. """
+        labels = self._flat_labels()
+        if labels is not self._pooled_labels:
+            # the labels changed, so pooled instances have out of date labels
+            self.context_pool.clear()
+            self._pooled_labels = labels
+        pool_key = (self.model_class, context_class)
+        context = self.context_pool.acquire(pool_key)
+        if context is None:
+            context = context_class(**{'model': self.model_class,
+                'labels': self._context_labels(context_class)})
+        rv = context.render(*args, **kwargs)
+        # only give the instance back if render succeeded, it could be left in a bad state
+        self.context_pool.release(pool_key, context)
+        return rv
+
+    def _labels_digest(self):
+        """ helper to get a digest of the flattened labels for render cache keys, that is
+            the same in every process (see SharedRenderCache).  It's only computed again
+            when the labels change.
+        """
+        labels = self._flat_labels()
+        cached = self._cached_labels_digest
+        if cached is None or cached[0] is not labels:
+            digest = blake2b(repr(tuple(labels.items())).encode('utf-8'), digest_size=16)
+            cached = self._cached_labels_digest = (labels, digest.hexdigest())
+        return cached[1]
+
+    def _render_cache_key(self, key, sub_key, context, args, kwargs):
+        """ helper that returns the render cache key for a call, or None if the call
+            should not be cached.
+        """
+        if not getattr(context, 'cacheable', False):
+            return None
+        rv = context.cache_key(*args, **kwargs)
+        if rv is None:
+            return None
+        # the context is part of the key, so a render that raced with register_context
+        # can't put output from a replaced context in the cache, the model so proxies
+        # for different models can share a cache and the labels so changing them does
+        # not get output rendered with the old ones
+        rv = (key, sub_key, context, rv, self.model_class, self._labels_digest())
+        try:
+            hash(rv)
+        except TypeError:
+            # unhashable args (a list, dict, etc.) can't be cached
+            return None
+        return rv
+
+
+def _render_rows(context, model_class, labels, rows, args, kwargs):
+    """ helper that renders a chunk of rows in a worker process for render_parallel. """
+    if isclass(context):
+        context = context(**{'model': model_class, 'labels': labels})
+    return context.render_rows(rows, *args, **kwargs)
+
+
+class ContextRenderer:
+    """ A context that has been resolved by BaseModelViewProxy.get_renderer.  Calling it
+        renders the context with the passed in args and kwargs.  Errors go to the
+        error_handler if one is set (see ModelViewProxy.get_renderer).
+    """
+    def __init__(self, proxy, context, error_handler=None):
+        self.proxy = proxy
+        self.spec = context
+        self.error_handler = error_handler
+        self._resolve()
+
+    def _resolve(self):
+        """ helper to resolve the context, returns and stores a (generation, key, sub-key,
+            context) tuple.  It's one attribute, so a thread never sees a key from one
+            resolve with the context from another.
+        """
+        # grab the generation first, so a registration during resolve is not missed
+        generation = self.proxy._generation
+        self._resolved = (generation,) + self.proxy._resolve_context(self.spec)
+        return self._resolved
+
+    @property
+    def key(self):
+        return self._resolved[1]
+
+    @property
+    def sub_key(self):
+        return self._resolved[2]
+
+    @property
+    def context(self):
+        return self._resolved[3]
+
+    def _render(self, args, kwargs):
+        resolved = self._resolved
+        if resolved[0] != self.proxy._generation:
+            resolved = self._resolve()
+        _, key, sub_key, context = resolved
+        return self.proxy._render_resolved(key, sub_key, context, args, kwargs)
+
+    def __call__(self, *args, **kwargs):
+        if self.error_handler is None:
+            return self._render(args, kwargs)
+        try:
+            return self._render(args, kwargs)
+        except Exception as e:
+            return self.error_handler.handle_error(e)
+
+    def __repr__(self):
+        return '<ContextRenderer: {!r}>'.format(self.spec)
+
 
 class ModelViewProxy(BaseModelViewProxy):
     """ Wraps all of BaseModelViewProxy's methods in an error handler.  That can be registered
         with this instance.
+
+        Errors passed to the error handler are counted by exception type in error_counts,
+        and every instance is tracked (weakly) so proxies.metrics can export metrics for
+        all of them.
     """
     def __init__(self, model_class, error_handler=None, *args, **kwargs):
         if error_handler is not None:
             self.error_handler = error_handler
         else:
             self.error_handler = BaseErrorHandler()
+        self.error_counts = {}
+        self._error_lock = Lock()
         try:
             super().__init__(model_class, *args, **kwargs)
         except TypeError as e:
-            self.error_handler.handle_error(e)
+            self.handle_error(e)
+        else:
+            _model_view_proxies.add(self)
+
+    def handle_error(self, error):
+        """ Count the error, then pass it on to the error handler. """
+        name = error.__class__.__name__
+        with self._error_lock:
+            self.error_counts[name] = self.error_counts.get(name, 0) + 1
+        return self.error_handler.handle_error(error)
 
     def register_context(self, *args, **kwargs):
         try:
             return super().register_context(*args, **kwargs)
-        except InvalidContextError as e:
-            return self.error_handler.handle_error(e)
+        except (InvalidContextError, FrozenError) as e:
+            return self.handle_error(e)
 
     def get_context(self, *args, **kwargs):
         try:
             return super().get_context(*args, **kwargs)
-        except KeyError as e:
-            return self.error_handler.handle_error(e)
+        except (KeyError, InvalidContextError) as e:
+            return self.handle_error(e)
+
+    def register_contexts(self, *args, **kwargs):
+        try:
+            return super().register_contexts(*args, **kwargs)
+        except (InvalidContextError, FrozenError) as e:
+            return self.handle_error(e)
+
+    def preload(self):
+        try:
+            return super().preload()
+        except InvalidContextError as e:
+            return self.handle_error(e)
+
+    def freeze(self):
+        try:
+            return super().freeze()
+        except InvalidContextError as e:
+            return self.handle_error(e)
     
     def init_context(self, *args, **kwargs):
         try:
             return super().init_context(*args, **kwargs)
         except Exception as e:
-            return self.error_handler.handle_error(e)
+            return self.handle_error(e)
 
     def render(self, *args, **kwargs):
         try:
             return super().render(*args, **kwargs)
         except Exception as e:
-            return self.error_handler.handle_error(e)
+            return self.handle_error(e)
+
+    async def arender(self, *args, **kwargs):
+        try:
+            return await super().arender(*args, **kwargs)
+        except Exception as e:
+            return self.handle_error(e)
+
+    def render_parallel(self, *args, **kwargs):
+        try:
+            return super().render_parallel(*args, **kwargs)
+        except Exception as e:
+            return self.handle_error(e)
+
+    def render_iter(self, *args, **kwargs):
+        """ Errors raised while iterating the chunks go to the error handler as well, if
+            it returns something it get's yielded as the last chunk.
+        """
+        try:
+            chunks = super().render_iter(*args, **kwargs)
+        except Exception as e:
+            return self.handle_error(e)
+        return self._handle_iter_errors(chunks)
+
+    def _handle_iter_errors(self, chunks):
+        try:
+            yield from chunks
+        except Exception as e:
+            rv = self.handle_error(e)
+            if rv is not None:
+                yield rv
+
+    def get_renderer(self, context):
+        """ Same as BaseModelViewProxy.get_renderer, but errors while resolving or calling
+            the renderer go to the error handler.
+        """
+        try:
+            return ContextRenderer(self, context, error_handler=self)
+        except Exception as e:
+            return self.handle_error(e)
@@ -0,0 +1,48 @@
+"""
+    proxies.pool
+    ~~~~~~~~~~~~
+"""
+from threading import local
+
+class ContextPool:
+    """ Keeps instances of context classes around per thread, so that a proxy does not
+        have to instantiate (and build a new OrderedLabels for) a context on every render.
+
+        A proxy acquires an instance before it renders and releases it afterwards.  On
+        release the context's reset hook get's called, which is where a context should
+        clear any state it set during render.  Each thread has it's own free list, so an
+        instance is only ever used by one render at a time, nested renders of the same
+        class included.
+
+        :ex:
+            >>> proxy = ModelViewProxy(Model, context_pool=ContextPool())
+    """
+    def __init__(self):
+        self._local = local()
+        self._generation = 0
+
+    def _free_lists(self):
+        """ helper to get this thread's free lists, dropping them if clear was called
+            since they were created.
+        """
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            local.generation = self._generation
+            local.free = {}
+        return local.free
+
+    def acquire(self, key):
+        """ Returns a pooled instance for :key: or None if there is not one free. """
+        free = self._free_lists().get(key)
+        if free:
+            return free.pop()
+        return None
+
+    def release(self, key, context):
+        """ Reset the context and make it available to the next acquire for :key:. """
+        context.reset()
+        self._free_lists().setdefault(key, []).append(context)
+
+    def clear(self):
+        """ Drop the pooled instances for every thread. """
+        self._generation += 1
@@ -0,0 +1,172 @@
+"""
+    proxies.profiling
+    ~~~~~~~~~~~~~~~~~
+
+        Opt-in capture of cProfile (and optionally tracemalloc) data for slow renders,
+        to catch pathological renders in production without profiling every request.
+
+        A render is profiled if it's sampled (:sample_rate:) or if the last render of
+        the same context took longer than :threshold: seconds, since we can't know a
+        render is going to be slow before it runs.  A profiled render is written to
+        :directory: when it's slower than :threshold: (or always if no threshold is
+        set), as a pstats file named model_key.sub-key_timestamp, plus a
+        .tracemalloc.txt file of the top allocations if :trace_memory: is set.  Only the
+        newest :max_files: captures are kept.
+
+        :ex:
+            >>> profiler = RenderProfiler('/var/tmp/proxies', threshold=0.5,
+            ...         sample_rate=0.001)
+            >>> proxy = ModelViewProxy(Model, profiler=profiler)
+            >>> pstats.Stats('/var/tmp/proxies/app.models.User_table.default_...prof')
+"""
+import os
+import re
+import cProfile
+import tracemalloc
+import warnings
+from datetime import datetime
+from random import random
+from threading import Lock
+from time import perf_counter
+
+PROFILE_SUFFIX = '.prof'
+MEMORY_SUFFIX = '.tracemalloc.txt'
+
+_unsafe = re.compile(r'[^A-Za-z0-9_.-]+')
+
+# cProfile and tracemalloc are process wide, so only one render get's profiled at a
+# time, a render that would be profiled while another one is just runs normally.
+_profiling = Lock()
+
+class RenderProfiler:
+    """ Decides which renders get profiled and writes the captures.  Pass one as the
+        :profiler: of a proxy, a profiler can be shared by several proxies.
+
+        :param directory:       Where captures are written, created if it does not exist.
+        :param threshold:       Renders slower than this (in seconds) get written, and
+                                arm profiling of the next render of that context.
+        :param sample_rate:     The fraction (0.0 - 1.0) of renders to profile regardless
+                                of how long the last render took.
+        :param max_files:       The number of captures to keep in :directory:, the oldest
+                                get removed.
+        :param trace_memory:    Also record allocations with tracemalloc.
+    """
+    def __init__(self, directory, threshold=None, sample_rate=0.0, max_files=20,
+            trace_memory=False, memory_top=25, random=random):
+        if threshold is None and sample_rate <= 0:
+            raise ValueError('need a threshold or a sample_rate')
+        if max_files < 1:
+            raise ValueError('max_files must be at least 1')
+        self.directory = directory
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.max_files = max_files
+        self.trace_memory = trace_memory
+        self.memory_top = memory_top
+        self.random = random
+        # (model, name)'s whose last render was slower than the threshold
+        self._armed = set()
+        self._count = 0
+        self._lock = Lock()
+        self.captures = 0
+
+    def call(self, model, name, func, *args, **kwargs):
+        """ Call func(*args, **kwargs) for a render of context :name: on :model:,
+            profiling it if it's sampled or armed.  Returns what func returns.
+        """
+        armed = (model, name) in self._armed
+        sampled = self.sample_rate > 0 and self.random() < self.sample_rate
+        if (armed or sampled) and _profiling.acquire(blocking=False):
+            try:
+                self._armed.discard((model, name))
+                return self._call_profiled(model, name, func, args, kwargs)
+            finally:
+                _profiling.release()
+
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if self.threshold is not None and perf_counter() - start > self.threshold:
+                self._armed.add((model, name))
+
+    def _call_profiled(self, model, name, func, args, kwargs):
+        """ helper to call func under cProfile (and tracemalloc) and write the capture if
+            it was slow enough.
+        """
+        memory_before = None
+        started_tracemalloc = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracemalloc = True
+            memory_before = tracemalloc.take_snapshot()
+
+        profile = cProfile.Profile()
+        start = perf_counter()
+        profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            seconds = perf_counter() - start
+            memory = None
+            if memory_before is not None:
+                memory = tracemalloc.take_snapshot().compare_to(memory_before, 'lineno')
+                if started_tracemalloc:
+                    tracemalloc.stop()
+            if self.threshold is None or seconds > self.threshold:
+                self._write(model, name, seconds, profile, memory)
+
+    def _write(self, model, name, seconds, profile, memory):
+        """ helper to write a capture and remove the oldest ones.  Errors writing get
+            turned into a warning, so they don't break the render.
+        """
+        with self._lock:
+            self._count += 1
+            count = self._count
+        base = os.path.join(self.directory, '{}_{}_{}_{}-{}'.format(
+                _unsafe.sub('_', model), _unsafe.sub('_', name),
+                datetime.now().strftime('%Y%m%dT%H%M%S.%f'), os.getpid(), count))
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            profile.dump_stats(base + PROFILE_SUFFIX)
+            if memory is not None:
+                with open(base + MEMORY_SUFFIX, 'w') as f:
+                    f.write('{} {} took {:.6f}s, top allocations:\n'.format(model, name,
+                            seconds))
+                    for stat in memory[:self.memory_top]:
+                        f.write('{}\n'.format(stat))
+            self.captures += 1
+            self._remove_old()
+        except OSError as e:
+            warnings.warn('could not write render profile: {}'.format(e), RuntimeWarning)
+
+    def _remove_old(self):
+        """ helper to remove all but the newest max_files captures in the directory. """
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(PROFILE_SUFFIX) and entry.is_file():
+                try:
+                    profiles.append((entry.stat().st_mtime, entry.name))
+                except FileNotFoundError:
+                    # another process removed it
+                    pass
+        profiles.sort()
+        for _, filename in profiles[:-self.max_files]:
+            base = os.path.join(self.directory, filename[:-len(PROFILE_SUFFIX)])
+            for path in (base + PROFILE_SUFFIX, base + MEMORY_SUFFIX):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+
+    def files(self):
+        """ Returns the paths of the profiles in the directory, oldest first. """
+        try:
+            entries = [entry for entry in os.scandir(self.directory) \
+                    if entry.name.endswith(PROFILE_SUFFIX)]
+        except FileNotFoundError:
+            return []
+        entries.sort(key=lambda entry: (entry.stat().st_mtime, entry.name))
+        return [entry.path for entry in entries]
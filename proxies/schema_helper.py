@@ -1,13 +1,71 @@
-from .core import BaseDict, BaseChainMap
+from types import MappingProxyType
+from .core import BaseDict, BaseChainMap, FrozenDict
 
 class SchemaKey(BaseDict):
     """ A dict object that the keys should map to model attributes and values should be
         a human friendly label to be used in a view context (form, table, etc.)
 
         On updates it returns self instead of None to be able to chain methods together.
+
+        Every change bumps a version number, which is how a SchemaMap knows when it's
+        snapshot is out of date.
     """    
-    pass
-   
+    _version = 0
+
+    def _changed(self):
+        self._version += 1
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+        return self
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self._changed()
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        self._changed()
+        return super().pop(*args)
+
+    def popitem(self):
+        self._changed()
+        return super().popitem()
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def copy(self):
+        return self.__class__(self)
+
+
+def _map_version(_map):
+    """ helper to get the version of a map in a SchemaMap, or None if it's a map that
+        does not keep track of changes (ex. a plain dict).
+    """
+    if isinstance(_map, SchemaKey):
+        return _map._version
+    if isinstance(_map, SchemaMap):
+        return _map.version
+    if isinstance(_map, FrozenDict):
+        return 0
+    return None
+
+
 class SchemaMap(BaseChainMap):
     """ A ChainMap object that chains dict's together.  This allows us to declare a SchemaKey
         on a model mixin and chain those values to models that use the mixin.  This gives
@@ -15,8 +73,71 @@ class SchemaMap(BaseChainMap):
         for every other model that uses that key, unless specifically changed on the base
         model/mixin during class creation.  If key get's changed after class creation then
         it only get's updated in that context. (see tests for more details).
+
+        Lookups on a ChainMap walk every map in the chain, so for read heavy code (ex.
+        rendering a table) use snapshot(), which returns a flattened read-only dict
+        of the labels that only get's rebuilt when one of the chained maps changes.
+        Maps are chained as they are passed in, like any ChainMap.  A plain dict does not
+        keep a version, so with one in the chain snapshot() flattens the labels on every
+        call, use SchemaKey's to get the cached snapshot.
     """
-    pass
+    # set by SchemaLabelMeta, the maps a class inherited (as is, and from it's bases) and
+    # the map it declared
+    _prefix = ()
+    _inherited = None
+    _declared = None
+
+    def __init__(self, *maps):
+        super().__init__(*maps)
+        if len(maps) == 0:
+            # use a SchemaKey instead of ChainMap's plain dict, so changes are versioned
+            self.maps = [SchemaKey()]
+        self._snapshot = None
+
+    def new_child(self, m=None, **kwargs):
+        if m is None:
+            m = SchemaKey(kwargs)
+            kwargs = {}
+        return super().new_child(m, **kwargs)
+
+    @property
+    def version(self):
+        """ A tuple that changes when any of the chained maps change, or None if one of
+            the maps is a plain dict, that we can't tell has changed.
+        """
+        rv = tuple(_map_version(_map) for _map in self.maps)
+        if None in rv:
+            return None
+        return rv
+
+    def snapshot(self):
+        """ Returns a flattened, read-only view of the labels.  The same view get's
+            returned until one of the chained maps changes (or the maps themselves
+            are changed), so it's cheap to call on every read.  With a map that is not
+            versioned in the chain the labels are flattened on every call, but the
+            same view is still returned if they did not change.
+        """
+        maps = self.maps
+        version = self.version
+        cached = self._snapshot
+        same_maps = cached is not None and len(cached[0]) == len(maps) and \
+                all(a is b for a, b in zip(cached[0], maps))
+        if same_maps and version is not None and cached[1] == version:
+            return cached[2]
+
+        flat = {}
+        for _map in reversed(maps):
+            flat.update(_map)
+        if same_maps and version is None and cached[1] is None and \
+                list(flat.items()) == list(cached[2].items()):
+            return cached[2]
+        rv = MappingProxyType(flat)
+        self._snapshot = (tuple(maps), version, rv)
+        return rv
+
+    def __reduce__(self):
+        # the cached snapshot can't be pickled and should be rebuilt anyway
+        return (self.__class__, tuple(self.maps))
 
 class SchemaLabelMeta(type):
     """ SchemaLabelMeta enforces all classes that implement SchemaLabelProtocol have
@@ -25,47 +146,98 @@ class SchemaLabelMeta(type):
         a class. The SchemaMap class allows us to have inherit labels, but use them in 
         a different context, so that updates don't always get reflected on other sub-classes
         unless the label is changed on the base-class that declares that label property.
+
+        The labels of base classes are not copied.  A new class's SchemaMap references
+        the maps of it's bases (each map only once), later bases first so they still
+        win.  Only a base's front map, that holds the changes made to the base's labels
+        after it was created, is copied (when it's not empty), so changing a base's
+        labels later does not show up on it's sub-classes.  The one exception is a
+        SchemaKey object declared as a base's labels, changing that object directly is
+        seen by the sub-classes too, since it's map is referenced not copied.
     """
     def __init__(cls, name, bases, attrs):
-        labels = SchemaMap()
-        # get bases of the class
-        bases = [base for base in bases if base.__name__ != 'SchemaLabelProtocol']
-        maps = []
-        # get the label maps from the bases if applicable
-        for base in bases:
-            if hasattr(base, 'labels'):
-                # get all the maps from base classes
-                maps += [_map for _map in base.labels.maps \
-                        if _map not in maps and _map not in labels.maps]
-        # update our SchemaMap instance with base class values
-        if len(maps) > 0:
-            for _map in maps:
-                # update labels
-                labels.update(_map)
-            # insert a new context in the front of our labels
-            labels.maps.insert(0, {})
         # allow base class to not throw errors if it does not have a labels
         # attribute, however enforce on sub-classes of base class ('SchemaLabelProtocol')
         if name != 'SchemaLabelProtocol':
+            labels = SchemaMap()
+            front = labels.maps[0]
+            declared = attrs.get('labels')
+            inherited = None
+            if 'labels' not in attrs:
+                inherited = getattr(cls, 'labels', None)
+            if isinstance(declared, SchemaMap):
+                front.update(declared)
+            elif isinstance(inherited, SchemaMap):
+                # labels inherited as is come first, as they are on the base
+                labels._prefix = tuple(_add_maps([], set(), _snapshot_front(inherited.maps)))
+            # get the label maps from the bases, the later bases win
+            maps = []
+            seen = set()
+            for base in reversed(bases):
+                base_labels = getattr(base, 'labels', None)
+                if base.__name__ != 'SchemaLabelProtocol' and \
+                        isinstance(base_labels, SchemaMap):
+                    _add_maps(maps, seen, _inherit_maps(base_labels))
+            labels._inherited = tuple(maps)
+
             error = True
-            if hasattr(cls, 'labels'):
-                if isinstance(cls.labels, SchemaMap):
-                    error = False
-                    labels.update(cls.labels)
-                if isinstance(cls.labels, SchemaKey):
-                    labels.maps.append(cls.labels)
-                    error = False
-                elif isinstance(cls.labels, dict):
-                    labels.maps.append(SchemaKey(cls.labels))
-                    error = False
-                # set labels on the new class
-                cls.labels = labels
+            value = declared if declared is not None else inherited
+            if isinstance(value, SchemaMap):
+                error = False
+            elif isinstance(value, SchemaKey):
+                labels._declared = value
+                error = False
+            elif isinstance(value, dict):
+                labels._declared = SchemaKey(value)
+                error = False
             # error if not implemented for a sub-class
             if error is True:
                 raise NotImplementedError('labels attr is not implemented for \'{}\''\
                         .format(name))
+            maps = [front]
+            _add_maps(maps, set([id(front)]), labels._prefix + labels._inherited)
+            if labels._declared is not None:
+                _add_maps(maps, set(map(id, maps)), [labels._declared])
+            labels.maps = maps
+            # set labels on the new class
+            cls.labels = labels
 
         return type.__init__(cls, name, bases, attrs)
+
+
+def _snapshot_front(maps):
+    """ helper that returns :maps: with the front map copied, or left out if empty. """
+    if len(maps[0]) > 0:
+        return [SchemaKey(maps[0])] + maps[1:]
+    return maps[1:]
+
+
+def _inherit_maps(labels):
+    """ helper to get the maps a sub-class inherits from a base's :labels:, in the order
+        they win.  The map a base declared wins over the ones it inherited from it's
+        bases, and those win over the labels in front (that is how merging them used
+        to work).
+    """
+    inherited = labels._inherited
+    front = [labels.maps[0]] + list(labels._prefix)
+    if inherited is None:
+        # not created by SchemaLabelMeta
+        inherited = labels.maps[1:]
+        front = labels.maps[:1]
+    declared = [labels._declared] if labels._declared is not None else []
+    return declared + list(inherited) + _snapshot_front(front)
+
+
+def _add_maps(maps, seen, new_maps):
+    """ helper to add the maps that are not in :maps: yet (:seen: holds their id's).  A
+        map that's already in there wins anyway, so it's not needed again.
+    """
+    for _map in new_maps:
+        if id(_map) not in seen:
+            seen.add(id(_map))
+            maps.append(_map)
+    return maps
+
     
 class SchemaLabelProtocol(metaclass=SchemaLabelMeta):
     """ Enforces the label attribute on sub-classes. """
@@ -0,0 +1,341 @@
+"""
+    proxies.shared_cache
+    ~~~~~~~~~~~~~~~~~~~~
+
+        A render cache that's shared by every process on a host (ex. the workers of a
+        pre-forking server), so rendered output is only rendered once per host instead
+        of once per worker, and a new worker starts with a warm cache.
+
+        Entries live in a memory-mapped file of fixed size slots, so the cache never
+        grows past :slots: * :slot_size: bytes.  Slots are grouped in buckets of :ways:
+        slots, an entry can only go in the bucket it's key hashes to and evicts the
+        least recently used entry of that bucket when it's full.  Every bucket is locked
+        with an fcntl record lock (and a thread lock, since record locks are per
+        process), so processes only wait on each other when they use the same bucket.
+
+        Registering a context does not invalidate the shared entries, every worker
+        registers it's contexts when it starts and would wipe out the entries the other
+        workers made.  Entries are keyed on the context's qualified name instead, so
+        registering a different context class under a key does not get the old output.
+        Use a new file (or clear it) when the code of a context changes, ex. on deploy.
+
+        Only renders of context classes are cached, and only when the cache key is made
+        of strings, bytes, numbers, None, classes and tuples of those, since the key
+        get's hashed by it's repr and those have the same repr in every process.  Other
+        keys (ex. an object with the default repr, which has it's address in it, or a
+        frozenset, which is ordered by hash) skip the cache.  Values that are not
+        strings get pickled, so the file has to be owned by the user running the
+        processes and not writable by others, or PermissionError is raised.  Cached
+        renders of a proxy are keyed on it's labels, so a worker whose labels are
+        different does not get output made with the other worker's labels.
+
+        :ex:
+            >>> cache = SharedRenderCache('/dev/shm/app.render-cache', slots=4096)
+            >>> proxy = ModelViewProxy(Model, render_cache=cache)
+"""
+import os
+import mmap
+import stat
+import fcntl
+import pickle
+import struct
+from hashlib import blake2b
+from inspect import isclass
+from threading import Lock
+from time import time, monotonic_ns
+
+MAGIC = b'PRXSRC01'
+# magic, slots, ways, slot size
+HEADER = struct.Struct('<8sIII')
+HEADER_SIZE = 64
+# used, kind, value length, digest, key tag, sub-key tag, expires (0 never), last used
+SLOT = struct.Struct('<BBxxI16sQQdQ')
+
+KIND_STR = 1
+KIND_PICKLE = 2
+
+# types with a repr that is the same in every process
+STABLE_TYPES = frozenset((str, bytes, int, float, bool, type(None)))
+
+class _Unstable(Exception):
+    pass
+
+
+def _stable(value):
+    """ helper to check a cache key value has the same repr in every process, returns
+        the value with classes named by their qualified name.  Raises _Unstable for
+        anything else.
+    """
+    if type(value) in STABLE_TYPES:
+        return value
+    if type(value) is tuple:
+        return tuple(_stable(item) for item in value)
+    if isclass(value):
+        return _name(value)
+    raise _Unstable()
+
+
+def _name(value):
+    """ helper to name classes by their qualified name in a cache key, their repr
+        is not the same in every process.
+    """
+    if isclass(value):
+        return '{}.{}'.format(value.__module__, value.__qualname__)
+    return value
+
+
+def _tag(*values):
+    """ helper to hash values to an int that is the same in every process (unlike
+        hash()).
+    """
+    return int.from_bytes(blake2b(repr(values).encode('utf-8'), digest_size=8).digest(),
+            'little')
+
+
+class SharedRenderCache:
+    """ A RenderCache backed by a memory-mapped file, see the module docs.  Has the same
+        methods as RenderCache.  Hit, miss, eviction and expiration counters are for
+        this process only.
+
+        :param path:        The file to map, made if it does not exist.  Put it on a
+                            tmpfs (ex. /dev/shm) so it's never written to disk.  Every
+                            process using a file has to pass the same sizes.  Raises
+                            PermissionError if another user owns it or can write to it.
+        :param slots:       The number of entries.
+        :param slot_size:   The size in bytes of a slot, values that don't fit in a
+                            slot (minus a small header) are not cached.
+        :param ways:        The number of slots in a bucket.
+        :param ttl:         Seconds entries are good for, None for ever.
+    """
+    # see the module docs
+    invalidate_on_register = False
+
+    def __init__(self, path, slots=1024, slot_size=16384, ways=8, ttl=None, timer=time):
+        if slots < ways or slots % ways != 0:
+            raise ValueError('slots must be a multiple of ways')
+        if slot_size <= SLOT.size:
+            raise ValueError('slot_size must be larger than {}'.format(SLOT.size))
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.ways = ways
+        self.buckets = slots // ways
+        self.ttl = ttl
+        self.timer = timer
+        self.maxsize = slots
+        self.max_value_size = slot_size - SLOT.size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = Lock()
+        self._size = HEADER_SIZE + slots * slot_size
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0),
+                0o600)
+        try:
+            self._check_owner()
+            self._init_file()
+            self._map = mmap.mmap(self._fd, self._size)
+        except Exception:
+            os.close(self._fd)
+            raise
+
+    def _check_owner(self):
+        """ helper to refuse a file that another user made or can write to.  The mode
+            passed to os.open is only used when it makes the file, and values in the file
+            get unpickled, so another user that made the file (ex. in /dev/shm) before us
+            could run code in this process.
+        """
+        st = os.fstat(self._fd)
+        if st.st_uid != os.getuid() or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            raise PermissionError("'{}' has to be owned by this user and not writable "\
+                    "by others".format(self.path))
+
+    def _init_file(self):
+        """ helper to write the header to a new file, or check the header of an existing
+            one.
+        """
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, HEADER_SIZE, 0)
+        try:
+            header = os.pread(self._fd, HEADER.size, 0)
+            expected = HEADER.pack(MAGIC, self.slots, self.ways, self.slot_size)
+            if len(header) == HEADER.size and header[:len(MAGIC)] == MAGIC:
+                if header != expected:
+                    raise ValueError("'{}' was made with different sizes".format(self.path))
+            else:
+                os.ftruncate(self._fd, self._size)
+                os.pwrite(self._fd, expected, 0)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, HEADER_SIZE, 0)
+
+    def _digest(self, cache_key):
+        """ helper that returns a (digest, bucket) tuple for a cache key, or None if the
+            key should not be shared.
+        """
+        try:
+            # context instances don't pass either, they may not be the same in other
+            # processes
+            data = repr(_stable(tuple(cache_key))).encode('utf-8')
+        except _Unstable:
+            return None
+        digest = blake2b(data, digest_size=16).digest()
+        return (digest, int.from_bytes(digest[:8], 'little') % self.buckets)
+
+    def _offset(self, slot):
+        return HEADER_SIZE + slot * self.slot_size
+
+    def _lock_bucket(self, bucket):
+        self._lock.acquire()
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self.ways * self.slot_size,
+                    self._offset(bucket * self.ways))
+        except Exception:
+            self._lock.release()
+            raise
+
+    def _unlock_bucket(self, bucket):
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, self.ways * self.slot_size,
+                    self._offset(bucket * self.ways))
+        finally:
+            self._lock.release()
+
+    def get(self, cache_key, default=None):
+        """ Returns the cached value for :cache_key: or :default: on a miss. """
+        found = self._digest(cache_key)
+        if found is None:
+            with self._lock:
+                self.misses += 1
+            return default
+        digest, bucket = found
+        data = None
+        self._lock_bucket(bucket)
+        try:
+            for slot in range(bucket * self.ways, (bucket + 1) * self.ways):
+                offset = self._offset(slot)
+                used, kind, length, slot_digest, key_tag, sub_tag, expires, _ = \
+                        SLOT.unpack_from(self._map, offset)
+                if not used or slot_digest != digest:
+                    continue
+                if expires and expires <= self.timer():
+                    self._map[offset] = 0
+                    self.expirations += 1
+                    break
+                SLOT.pack_into(self._map, offset, used, kind, length, slot_digest, key_tag,
+                        sub_tag, expires, monotonic_ns())
+                start = offset + SLOT.size
+                data = (kind, self._map[start:start + length])
+                break
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        finally:
+            self._unlock_bucket(bucket)
+
+        if data is None:
+            return default
+        kind, value = data
+        if kind == KIND_STR:
+            return value.decode('utf-8')
+        return pickle.loads(value)
+
+    def set(self, cache_key, value):
+        found = self._digest(cache_key)
+        if found is None:
+            return
+        digest, bucket = found
+        if isinstance(value, str):
+            kind = KIND_STR
+            data = value.encode('utf-8')
+        else:
+            kind = KIND_PICKLE
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_value_size:
+            return
+        expires = 0.0
+        if self.ttl is not None:
+            expires = self.timer() + self.ttl
+        key_tag = _tag(_name(cache_key[0]))
+        sub_tag = _tag(_name(cache_key[0]), _name(cache_key[1]))
+
+        self._lock_bucket(bucket)
+        try:
+            now = self.timer()
+            match = free = oldest = None
+            for slot in range(bucket * self.ways, (bucket + 1) * self.ways):
+                used, _, _, slot_digest, _, _, slot_expires, last_used = \
+                        SLOT.unpack_from(self._map, self._offset(slot))
+                if used and slot_digest == digest:
+                    match = slot
+                    break
+                if not used or (slot_expires and slot_expires <= now):
+                    if free is None:
+                        free = slot
+                elif oldest is None or last_used < oldest[1]:
+                    oldest = (slot, last_used)
+            if match is not None:
+                target = match
+            elif free is not None:
+                target = free
+            else:
+                # the bucket is full, evict it's least recently used entry
+                target = oldest[0]
+                self.evictions += 1
+            offset = self._offset(target)
+            start = offset + SLOT.size
+            self._map[start:start + len(data)] = data
+            SLOT.pack_into(self._map, offset, 1, kind, len(data), digest, key_tag, sub_tag,
+                    expires, monotonic_ns())
+        finally:
+            self._unlock_bucket(bucket)
+
+    def invalidate(self, key, sub_key=None):
+        """ Drop every entry for a key, or only the entries for key.sub_key. """
+        if sub_key is None:
+            tag, index = _tag(_name(key)), 4
+        else:
+            tag, index = _tag(_name(key), _name(sub_key)), 5
+        count = 0
+        for bucket in range(self.buckets):
+            self._lock_bucket(bucket)
+            try:
+                for slot in range(bucket * self.ways, (bucket + 1) * self.ways):
+                    offset = self._offset(slot)
+                    entry = SLOT.unpack_from(self._map, offset)
+                    if entry[0] and entry[index] == tag:
+                        self._map[offset] = 0
+                        count += 1
+            finally:
+                self._unlock_bucket(bucket)
+        return count
+
+    def clear(self):
+        for bucket in range(self.buckets):
+            self._lock_bucket(bucket)
+            try:
+                for slot in range(bucket * self.ways, (bucket + 1) * self.ways):
+                    self._map[self._offset(slot)] = 0
+            finally:
+                self._unlock_bucket(bucket)
+
+    def stats(self):
+        """ Returns a dict of this process's counters, plus the current and max size. """
+        return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'size': len(self),
+                'maxsize': self.maxsize }
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            os.close(self._fd)
+            self._map = None
+
+    def __len__(self):
+        # the used flags, read without locking
+        return sum(1 for slot in range(self.slots) if self._map[self._offset(slot)])
@@ -0,0 +1,133 @@
+"""
+    proxies.snapshot
+    ~~~~~~~~~~~~~~~~
+
+        Warm start snapshots of a proxy.  The registered contexts (as import paths) and
+        the flattened labels get written to a compact JSON file, so new workers can load
+        that instead of importing and registering every context.  A proxy frozen by
+        load_snapshot only imports a context's module, and sorts the labels in to the
+        context's label_order, the first time the context is rendered.  The sorted
+        label orders are not stored, parsing them takes as long as sorting them again.
+
+        A snapshot stores the labels it was made with, and loading it raises
+        StaleSnapshotError if the model's labels have changed since.
+
+        :ex:
+            >>> export_snapshot(proxy, '/var/run/app/users.proxy.json')
+
+            >>> # in a worker
+            >>> proxy = BaseModelViewProxy(User)
+            >>> load_snapshot(proxy, '/var/run/app/users.proxy.json', freeze=True)
+"""
+import os
+import sys
+import json
+import tempfile
+from inspect import isclass
+
+from .context_registry import LazyContext
+from .model_view import qualified_name
+
+SNAPSHOT_VERSION = 1
+
+class StaleSnapshotError(ValueError):
+    """ Raised when a snapshot does not match the proxy it's loaded in to. """
+    pass
+
+
+def import_path(context):
+    """ Returns the 'module:QualName' import path of a context class, or raises
+        ValueError if it can't be imported by that path (ex. an instance or a class
+        defined in a function).
+    """
+    if isinstance(context, LazyContext):
+        return context.path
+    if not isclass(context):
+        raise ValueError('context instance {!r} has no import path'.format(context))
+    rv = sys.modules.get(context.__module__)
+    for name in context.__qualname__.split('.'):
+        rv = getattr(rv, name, None)
+    if rv is not context:
+        raise ValueError("context '{}' can't be imported by it's name".format(
+            qualified_name(context)))
+    return '{}:{}'.format(context.__module__, context.__qualname__)
+
+
+def dump(proxy):
+    """ Returns the snapshot of :proxy: as a JSON-able dict. """
+    contexts = []
+    for key, registry in proxy.registerys.items():
+        # don't import lazy contexts just to get their path
+        for sub_key, context in registry.items(resolve=False):
+            contexts.append([key, sub_key, import_path(context)])
+
+    return {
+            'version': SNAPSHOT_VERSION,
+            'model': qualified_name(proxy.model_class),
+            'labels': [[key, value] for key, value in proxy._flat_labels().items()],
+            'contexts': contexts }
+
+
+def dumps(proxy):
+    return json.dumps(dump(proxy), separators=(',', ':'))
+
+
+def export_snapshot(proxy, path):
+    """ Write the snapshot of :proxy: to :path:.  The file is written next to :path: and
+        then renamed, so a worker never reads half a file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.proxies', suffix='.json.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(dumps(proxy))
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def check(proxy, snapshot):
+    """ Raises StaleSnapshotError if :snapshot: was not made for :proxy:'s model and
+        labels.
+    """
+    if snapshot.get('version') != SNAPSHOT_VERSION:
+        raise StaleSnapshotError('snapshot version {} is not {}'.format(
+            snapshot.get('version'), SNAPSHOT_VERSION))
+    model = qualified_name(proxy.model_class)
+    if snapshot['model'] != model:
+        raise StaleSnapshotError("snapshot is for model '{}', not '{}'".format(
+            snapshot['model'], model))
+    labels = proxy._flat_labels()
+    if snapshot['labels'] != [[key, value] for key, value in labels.items()]:
+        old = dict((key, value) for key, value in snapshot['labels'])
+        changed = sorted(set(old).symmetric_difference(labels) | \
+                set(k for k in old if k in labels and old[k] != labels[k]))
+        raise StaleSnapshotError("labels for '{}' changed since the snapshot: {}".format(
+            model, ', '.join(changed) or 'order'))
+
+
+def load(proxy, snapshot, freeze=False):
+    """ Load a snapshot dict in to :proxy:.  Contexts are registered by import path, so
+        they only get imported when they're first used.
+
+        :param freeze:  Freeze the proxy after loading, without importing the contexts
+                        (see BaseModelViewProxy.freeze).
+
+        :returns:       The proxy.
+    """
+    check(proxy, snapshot)
+    contexts = {}
+    for key, sub_key, path in snapshot['contexts']:
+        contexts.setdefault(key, {})[sub_key] = path
+    proxy.register_contexts(contexts)
+    if freeze:
+        proxy.freeze(preload=False)
+    return proxy
+
+
+def load_snapshot(proxy, path, freeze=False):
+    """ Load the snapshot file at :path: in to :proxy:, see load. """
+    with open(path) as f:
+        snapshot = json.load(f)
+    return load(proxy, snapshot, freeze=freeze)
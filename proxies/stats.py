@@ -0,0 +1,57 @@
+"""
+    proxies.stats
+    ~~~~~~~~~~~~~
+"""
+from bisect import bisect_left
+from threading import Lock
+
+# upper bounds (in seconds) of the latency histogram buckets, the last bucket is for
+# everything above the largest bound.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+        1.0, 2.5, 5.0, 10.0)
+
+class RenderStats:
+    """ Collects call counts, cumulative and max latency and a latency histogram for
+        each (method, name) a proxy records, where method is 'render' or 'init_context'
+        and name is the key.sub-key of the context (or it's class name if it was not
+        rendered by key).
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = Lock()
+        self._stats = {}
+
+    def record(self, method, name, seconds):
+        with self._lock:
+            stat = self._stats.get((method, name))
+            if stat is None:
+                # [count, total, max, bucket counts]
+                stat = self._stats[(method, name)] = [0, 0.0, 0.0,
+                        [0] * (len(self.buckets) + 1)]
+            stat[0] += 1
+            stat[1] += seconds
+            if seconds > stat[2]:
+                stat[2] = seconds
+            stat[3][bisect_left(self.buckets, seconds)] += 1
+
+    def as_dict(self):
+        """ Returns {method: {name: {'count', 'total', 'max', 'mean', 'histogram'}}}, where
+            histogram is a list of (upper bound, count) pairs, not cumulative, with None
+            as the upper bound of the last bucket.
+        """
+        rv = {}
+        with self._lock:
+            items = [(key, list(stat[:3]) + [list(stat[3])]) for key, stat in self._stats.items()]
+        bounds = self.buckets + (None,)
+        for (method, name), (count, total, max_, buckets) in items:
+            rv.setdefault(method, {})[name] = {
+                    'count': count,
+                    'total': total,
+                    'max': max_,
+                    'mean': total / count,
+                    'histogram': list(zip(bounds, buckets)) }
+        return rv
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
@@ -0,0 +1,143 @@
+"""
+    proxies.tracing
+    ~~~~~~~~~~~~~~~
+
+        Optional tracing of nested renders.  Inside a trace() block every render (and
+        arender) on a proxy records a span, and renders made from inside a context's
+        render (ex. a page context rendering 'table.default') become children of that
+        span.  The current span is kept in a contextvar, so spans stay correct across
+        threads (a new thread starts outside the trace, unless it runs in a copied
+        context) and asyncio tasks (which copy the context they were created in).
+
+        :ex:
+            >>> with trace() as t:
+            ...     proxy.render('page.default')
+            >>> t.to_json()
+            >>> t.write_chrome_trace('render.trace.json')
+"""
+import os
+import json
+from threading import Lock, get_ident
+from time import perf_counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# the Trace or Span that new spans get added to
+_current = ContextVar('proxies_current_span', default=None)
+_lock = Lock()
+# the number of trace blocks open in the process, proxies skip tracing when it's 0
+active = 0
+
+class Span:
+    """ One render call. """
+    __slots__ = ('model', 'key', 'sub_key', 'name', 'start', 'end', 'thread', 'children')
+
+    def __init__(self, model, key, sub_key, name):
+        self.model = model
+        self.key = key
+        self.sub_key = sub_key
+        self.name = name
+        self.thread = get_ident()
+        self.children = []
+        self.end = None
+        self.start = perf_counter()
+
+    @property
+    def duration(self):
+        if self.end is None:
+            return None
+        return self.end - self.start
+
+    def as_dict(self, origin=0.0):
+        """ Returns the span and it's children as a dict, start is in seconds from
+            :origin:.
+        """
+        return {
+                'model': self.model,
+                'key': self.key,
+                'sub_key': self.sub_key,
+                'name': self.name,
+                'start': self.start - origin,
+                'duration': self.duration,
+                'thread': self.thread,
+                'children': [child.as_dict(origin) for child in self.children] }
+
+
+class Trace:
+    """ The spans recorded in a trace block.  Top level renders are in children. """
+
+    def __init__(self):
+        self.children = []
+        self.start = perf_counter()
+
+    def spans(self):
+        """ Yields every span in the trace, parents before their children. """
+        stack = list(reversed(self.children))
+        while stack:
+            span = stack.pop()
+            yield span
+            stack.extend(reversed(span.children))
+
+    def as_dict(self):
+        return {'spans': [span.as_dict(self.start) for span in self.children]}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def to_chrome_trace(self):
+        """ Returns the spans as Chrome trace-event format complete ('X') events, which
+            can be loaded in chrome://tracing or Perfetto.
+        """
+        pid = os.getpid()
+        events = []
+        for span in self.spans():
+            if span.end is None:
+                continue
+            events.append({
+                'name': span.name,
+                'cat': span.model,
+                'ph': 'X',
+                'ts': (span.start - self.start) * 1e6,
+                'dur': span.duration * 1e6,
+                'pid': pid,
+                'tid': span.thread,
+                'args': {'model': span.model, 'key': span.key, 'sub_key': span.sub_key} })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+@contextmanager
+def trace():
+    """ Record the renders made inside the block (in this context) to a Trace. """
+    global active
+    t = Trace()
+    token = _current.set(t)
+    with _lock:
+        active += 1
+    try:
+        yield t
+    finally:
+        with _lock:
+            active -= 1
+        _current.reset(token)
+
+
+def start_span(model, key, sub_key, name):
+    """ Start a span under the current span.  Returns a (span, token) tuple to pass to
+        end_span, or None when not inside a trace.
+    """
+    parent = _current.get()
+    if parent is None:
+        return None
+    span = Span(model, key, sub_key, name)
+    parent.children.append(span)
+    return (span, _current.set(span))
+
+
+def end_span(started):
+    span, token = started
+    span.end = perf_counter()
+    _current.reset(token)
@@ -16,21 +16,45 @@ class OrderedLabels(OrderedDict):
         second to last being item -2 and so on. This is helpful when you only care about
         moving a certain key to the end of the order.
     """
+    # computed key orders, keyed on (label keys, order_kwargs items)
+    _key_orders = {}
+    max_cached_orders = 1024
+
     def __init__(self, labels, order_kwargs):
         if len(order_kwargs) > 0:
-            # get all the orders that are negative numbers
-            negatives = sorted([ (k, v) for k, v in order_kwargs.items() if v < 0 ])
-            # get all the orders that are positve numbers
-            positives = sorted([ (k, v) for k, v in order_kwargs.items() if v >= 0 ])
-            # combine the keys that are already accounted for in the lists
-            accounted_for_keys = [ k[0] for k in negatives ] + [ k[0] for k in positives ]
-            # check for any left over keys and add them to the positives
-            for key in labels.keys():
-                if key not in accounted_for_keys:
-                    positives.append((key, positives[-1][1] + 1))
+            # always sorted, even when labels is an OrderedLabels in the same order, since
+            # keys could have been added to it.  The order is cached, so that's cheap.
+            keys = self.key_order(tuple(labels), order_kwargs)
             # initialize an ordered dict with the key,values in the right order
-            super().__init__([ (k, labels[k]) for k, _ in positives + negatives ])
-        super().__init__(labels)
+            super().__init__([ (k, labels[k]) for k in keys ])
+        else:
+            super().__init__(labels)
+        self.order_kwargs = order_kwargs
+
+    @classmethod
+    def key_order(cls, keys, order_kwargs):
+        """ Returns a tuple of the :keys: in the order described by :order_kwargs:.  Orders
+            are cached, so building OrderedLabels for the same label keys and order again
+            only costs the dict build.
+        """
+        cache_key = (keys, frozenset(order_kwargs.items()))
+        try:
+            return cls._key_orders[cache_key]
+        except KeyError:
+            pass
+        # get all the orders that are negative numbers
+        negatives = sorted([ (v, k) for k, v in order_kwargs.items() if v < 0 ])
+        # get all the orders that are positve numbers
+        positives = sorted([ (v, k) for k, v in order_kwargs.items() if v >= 0 ])
+        # any keys not in the order_kwargs go after the positives, in the order they
+        # come in
+        left_over = [ k for k in keys if k not in order_kwargs ]
+        rv = tuple([ k for _, k in positives ] + left_over + [ k for _, k in negatives ])
+
+        if len(cls._key_orders) >= cls.max_cached_orders:
+            cls._key_orders.clear()
+        cls._key_orders[cache_key] = rv
+        return rv
     
     def update(self, kwargs):
         """ Returns self instead of None on update to allow methods to be chained. """
@@ -0,0 +1,99 @@
+from unittest import TestCase
+from contextlib import redirect_stdout
+import io
+import json
+import os
+import sys
+import tempfile
+
+import extra
+from proxies import bench
+
+class BenchTestCase(TestCase):
+
+    def test_benchmarks_return_cases(self):
+        results = bench.bench_registry(sizes=(10,))
+        self.assertListEqual(list(results), ['get[10]', 'setitem[10]'])
+        self.assertTrue(all(v > 0 for v in results.values()))
+        results = bench.bench_ordered_labels(sizes=(200,))
+        self.assertIn('ordered[200]', results)
+        results = bench.bench_label_classes(count=10, depths=(2,))
+        self.assertIn('bytes_per_class[10]', results)
+        results = bench.bench_warm_start(modules=1, classes=1, sub_keys=2, columns=2)
+        self.assertIn('load_snapshot[2]', results)
+        self.assertFalse(any(name.startswith('_proxies_bench_warm') for name in sys.modules))
+        results = bench.bench_named_tuple_helper()
+        self.assertIn('uncached_namedtuple', results)
+        # the benchmarked helper calls share one cached class
+        PersonKey = extra.NamedTupleHelper('PersonKey', 'id', 'name')
+        self.assertIs(type(PersonKey('Id', 'Name')),
+                extra._cached_namedtuple('PersonKey', ['id', 'name']))
+        self.assertGreater(extra._tuple_class.cache_info().hits, 0)
+
+    def test_run(self):
+        self.assertRaises(KeyError, bench.run, ['fails'])
+        self.assertIn('render_parallel', bench.SLOW_BENCHMARKS)
+
+    def test_main_emits_json(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            bench.main(['type_parser'])
+        document = json.loads(out.getvalue())
+        self.assertListEqual(list(document['benchmarks']), ['type_parser'])
+        self.assertIn('list[10]', document['benchmarks']['type_parser'])
+        self.assertIn('python', document)
+
+    def test_quartiles(self):
+        self.assertTupleEqual(bench.quartiles([3]), (3, 3, 3))
+        self.assertTupleEqual(bench.quartiles([5, 1, 4, 2, 3]), (1.5, 3, 4.5))
+
+
+def document(samples):
+    return {'benchmarks': bench.summarize(samples), 'samples': samples}
+
+
+class CompareTestCase(TestCase):
+
+    def test_regression_is_flagged(self):
+        baseline = document({'render': {'a': [1.0, 1.1, 0.9, 1.0, 1.0]}})
+        current = document({'render': {'a': [1.5, 1.6, 1.4, 1.5, 1.5]}})
+        (name, case, base, now, ratio, regressed), = bench.compare(baseline, current)
+        self.assertEqual((name, case), ('render', 'a'))
+        self.assertAlmostEqual(ratio, 1.5)
+        self.assertTrue(regressed)
+        # not beyond the threshold
+        self.assertFalse(bench.compare(baseline, current, threshold=0.6)[0][-1])
+
+    def test_noise_is_not_flagged(self):
+        baseline = document({'render': {'a': [1.0, 1.0, 2.0, 1.0, 2.0]}})
+        # higher median, but the samples overlap the baseline's
+        current = document({'render': {'a': [1.0, 2.0, 2.0, 2.0, 1.0]}})
+        self.assertFalse(bench.compare(baseline, current)[0][-1])
+
+    def test_missing_cases_and_documents_without_samples(self):
+        baseline = {'benchmarks': {'render': {'a': 1.0}}}
+        current = document({'render': {'a': [2.0, 2.0, 2.0], 'b': [1.0]}})
+        comparison = bench.compare(baseline, current)
+        self.assertEqual(len(comparison), 1)
+        self.assertTrue(comparison[0][-1])
+
+    def setUp(self):
+        # a quick benchmark, so main does not have to run the real ones
+        bench.BENCHMARKS['quick'] = lambda: {'case': bench.time_per_call(dict, number=10)}
+
+    def tearDown(self):
+        del bench.BENCHMARKS['quick']
+
+    def test_main_exits_non_zero_on_regression(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            with open(path, 'w') as f:
+                json.dump({'benchmarks': {'quick': {'case': 1e-12}}}, f)
+            with redirect_stdout(io.StringIO()) as out:
+                self.assertEqual(bench.main(['quick', '--compare', path]), 1)
+            self.assertIn('REGRESSED', out.getvalue())
+
+            with open(path, 'w') as f:
+                json.dump({'benchmarks': {'quick': {'case': 1.0}}}, f)
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(bench.main(['quick', '--compare', path]), 0)
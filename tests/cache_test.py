@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+from proxies.cache import RenderCache
+
+class FakeTimer:
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class RenderCacheTestCase(TestCase):
+
+    def test_get_and_set(self):
+        c = RenderCache()
+        self.assertIsNone(c.get(('table', 'default', ())))
+        c.set(('table', 'default', ()), 'Table')
+        self.assertEqual(c.get(('table', 'default', ())), 'Table')
+        self.assertEqual(c.stats()['hits'], 1)
+        self.assertEqual(c.stats()['misses'], 1)
+        self.assertEqual(len(c), 1)
+
+    def test_least_recently_used_gets_evicted(self):
+        c = RenderCache(maxsize=2)
+        c.set(('a', 'default', ()), 'a')
+        c.set(('b', 'default', ()), 'b')
+        # touch a, so b is the least recently used
+        c.get(('a', 'default', ()))
+        c.set(('c', 'default', ()), 'c')
+        self.assertIsNone(c.get(('b', 'default', ())))
+        self.assertEqual(c.get(('a', 'default', ())), 'a')
+        self.assertEqual(c.stats()['evictions'], 1)
+        self.assertRaises(ValueError, RenderCache, maxsize=0)
+
+    def test_ttl_expires_entries(self):
+        timer = FakeTimer()
+        c = RenderCache(ttl=10, timer=timer)
+        c.set(('a', 'default', ()), 'a')
+        timer.now = 9
+        self.assertEqual(c.get(('a', 'default', ())), 'a')
+        timer.now = 10
+        self.assertIsNone(c.get(('a', 'default', ())))
+        self.assertEqual(c.stats()['expirations'], 1)
+        self.assertEqual(len(c), 0)
+
+    def test_invalidate(self):
+        c = RenderCache()
+        c.set(('a', 'default', ()), 'a')
+        c.set(('a', 'default', (1,)), 'a1')
+        c.set(('a', 'other', ()), 'other')
+        c.set(('b', 'default', ()), 'b')
+        self.assertEqual(c.invalidate('a', 'default'), 2)
+        self.assertEqual(c.get(('a', 'other', ())), 'other')
+        self.assertEqual(c.invalidate('a'), 1)
+        self.assertEqual(len(c), 1)
+        c.clear()
+        self.assertEqual(len(c), 0)
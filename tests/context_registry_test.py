@@ -1,8 +1,10 @@
 from unittest import TestCase
 
+import sys
 from inspect import isgenerator
 
-from proxies.context_registry import ContextContainer, InvalidContextError, ContextRegistry
+from proxies.context_registry import ContextContainer, InvalidContextError, ContextRegistry, \
+        LazyContext, InvalidContextsError, validate_contexts
 from proxies.core import BaseViewContext
 
 class ContextRegistryTestCase(TestCase):
@@ -69,3 +71,104 @@ class ContextRegistryTestCase(TestCase):
         self.assertEqual(len(r.contexts), 1)
 
 
+    def test_setitem_on_existing_key_moves_key_to_the_end(self):
+        r = ContextRegistry(BaseViewContext)
+        class TestViewContext(BaseViewContext):
+            pass
+
+        r['a'] = BaseViewContext
+        r['default'] = TestViewContext
+        self.assertTupleEqual(r.keys(), ('a', 'default'))
+        self.assertTupleEqual(r.values(), (BaseViewContext, TestViewContext))
+        self.assertEqual(r.contexts[-1], ContextContainer('default', TestViewContext))
+
+    def test_delitem_contains_and_len(self):
+        r = ContextRegistry(BaseViewContext)
+        r['a'] = BaseViewContext
+        self.assertIn('a', r)
+        self.assertEqual(len(r), 2)
+        del r['a']
+        self.assertNotIn('a', r)
+        self.assertEqual(len(r), 1)
+        self.assertRaises(KeyError, r.__delitem__, 'a')
+        # still truthy when empty
+        self.assertTrue(ContextRegistry())
+
+
+class LazyContextTestCase(TestCase):
+
+    def setUp(self):
+        sys.modules.pop('tests.lazy_views', None)
+
+    def test_import_path(self):
+        r = ContextRegistry('default', 'tests.lazy_views:LazyTable')
+        self.assertIsInstance(r._contexts['default'], LazyContext)
+        self.assertNotIn('tests.lazy_views', sys.modules)
+        context = r.get('default')
+        self.assertIs(context, sys.modules['tests.lazy_views'].LazyTable)
+        # replaced with the context once it's resolved
+        self.assertIs(r._contexts['default'], context)
+        self.assertIs(r['default'], context)
+
+    def test_contexts_does_not_import(self):
+        r = ContextRegistry('default', 'tests.lazy_views:LazyTable')
+        r['missing'] = 'tests.lazy_views:Missing'
+        self.assertListEqual([c.key for c in r.contexts], ['default', 'missing'])
+        self.assertIsInstance(r.contexts[0].context, LazyContext)
+        self.assertNotIn('tests.lazy_views', sys.modules)
+
+    def test_invalid_import_paths(self):
+        self.assertRaises(InvalidContextError, ContextRegistry, 'default', ':LazyTable')
+        r = ContextRegistry()
+        r['missing'] = 'tests.lazy_views:Missing'
+        r['module'] = 'tests.no_such_module:LazyTable'
+        r['invalid'] = 'tests.lazy_views:NotAContext'
+        self.assertRaises(InvalidContextError, r.get, 'missing')
+        self.assertRaises(InvalidContextError, r.get, 'module')
+        self.assertRaises(InvalidContextError, r.get, 'invalid')
+        self.assertRaises(InvalidContextError, r.preload)
+
+    def test_preload(self):
+        r = ContextRegistry('default', BaseViewContext)
+        r['a'] = 'tests.lazy_views:LazyTable'
+        self.assertEqual(r.preload(), 1)
+        self.assertEqual(r.preload(), 0)
+        self.assertTupleEqual(r.keys(), ('default', 'a'))
+        self.assertIs(r._contexts['a'], sys.modules['tests.lazy_views'].LazyTable)
+
+    def test_values_are_resolved(self):
+        r = ContextRegistry('default', 'tests.lazy_views:LazyTable')
+        self.assertFalse(any(isinstance(v, LazyContext) for v in r.values()))
+
+
+class BulkRegistrationTestCase(TestCase):
+
+    def test_update(self):
+        r = ContextRegistry('default', BaseViewContext)
+        r.update({'a': BaseViewContext, 'default': 'tests.lazy_views:LazyTable'})
+        self.assertTupleEqual(r.keys(), ('a', 'default'))
+        r.update([('b', BaseViewContext)])
+        self.assertTupleEqual(r.keys(), ('a', 'default', 'b'))
+
+    def test_copy(self):
+        r = ContextRegistry('default', BaseViewContext).freeze()
+        copy = r.copy()
+        self.assertFalse(copy.frozen)
+        copy['a'] = BaseViewContext
+        self.assertTupleEqual(copy.keys(), ('default', 'a'))
+        self.assertTupleEqual(r.keys(), ('default',))
+
+    def test_update_is_all_or_nothing(self):
+        r = ContextRegistry('default', BaseViewContext)
+        with self.assertRaises(InvalidContextsError) as cm:
+            r.update({'a': BaseViewContext, 'b': 'invalid', 'c': None})
+        self.assertListEqual([name for name, _ in cm.exception.errors], ['b', 'c'])
+        self.assertIsInstance(cm.exception, InvalidContextError)
+        self.assertTupleEqual(r.keys(), ('default',))
+
+    def test_validate_contexts(self):
+        context = BaseViewContext(model={}, labels={})
+        items = [(i, context) for i in range(3)] + [(3, 'tests.lazy_views:LazyTable')]
+        validated = validate_contexts(items)
+        self.assertListEqual([c for _, c in validated[:3]], [context] * 3)
+        self.assertIsInstance(validated[3][1], LazyContext)
@@ -1,5 +1,7 @@
 from unittest import TestCase
-from proxies.core import BaseDict, BaseViewContext
+import pickle
+
+from proxies.core import BaseDict, BaseViewContext, FrozenDict, FrozenError
 
 class BaseDictTestCase(TestCase):
 
@@ -16,6 +18,16 @@ class BaseDictTestCase(TestCase):
         self.assertRaises(AttributeError, lambda: b.fails)
 
 
+class FrozenDictTestCase(TestCase):
+
+    def test_pickles(self):
+        frozen = FrozenDict({'id': 'Id', 'name': 'Name'})
+        loaded = pickle.loads(pickle.dumps(frozen))
+        self.assertIsInstance(loaded, FrozenDict)
+        self.assertDictEqual(loaded, frozen)
+        self.assertRaises(FrozenError, loaded.update, {'id': 'New Id'})
+
+
 class BaseViewContextTestCase(TestCase):
 
     def test_base_view_context(self):
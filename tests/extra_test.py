@@ -0,0 +1,116 @@
+from unittest import TestCase
+from threading import Thread
+
+import extra
+from extra import NamedTupleHelper
+
+class NamedTupleHelperTestCase(TestCase):
+
+    def test_call(self):
+        PersonKey = NamedTupleHelper('PersonKey', 'id', 'name')
+        p = PersonKey('Id', 'Name')
+        self.assertTupleEqual(p, ('Id', 'Name'))
+        self.assertEqual(p.name, 'Name')
+        EmployeeKey = NamedTupleHelper('EmployeeKey', 'employee_no', combines=(p,))
+        e = EmployeeKey('Employee Number')
+        self.assertDictEqual(e._asdict(), {'employee_no': 'Employee Number', 'id': 'Id',
+            'name': 'Name'})
+
+    def test_classes_are_cached(self):
+        PersonKey = NamedTupleHelper('PersonKey', 'id', 'name')
+        self.assertIs(type(PersonKey('Id', 'Name')), type(PersonKey('Id2', 'Name2')))
+        # another helper with the same name and fields shares the class
+        Other = NamedTupleHelper('PersonKey', 'id', 'name')
+        self.assertIs(type(Other('Id', 'Name')), type(PersonKey('Id', 'Name')))
+        self.assertIsNot(type(NamedTupleHelper('PersonKey', 'name', 'id')('a', 'b')),
+                type(PersonKey('Id', 'Name')))
+
+        p = PersonKey('Id', 'Name')
+        EmployeeKey = NamedTupleHelper('EmployeeKey', 'employee_no', combines=(p,))
+        Employee2 = NamedTupleHelper('EmployeeKey', 'employee_no', combines=(p,))
+        self.assertIs(EmployeeKey.partial.func, Employee2.partial.func)
+        self.assertIs(type(EmployeeKey('1')), type(Employee2('2')))
+        self.assertIs(EmployeeKey.clean_tuple('Fresh'), EmployeeKey.clean_tuple('Fresh'))
+        self.assertIs(type(EmployeeKey.clean_tuple('Fresh')(employee_no=1, id=2, name=3)),
+                type(Employee2.clean_tuple('Fresh')(employee_no=1, id=2, name=3)))
+        self.assertIs(NamedTupleHelper._new_tuple('Fresh', ['employee_no', 'id', 'name']),
+                type(EmployeeKey.clean_tuple('Fresh')(1, 2, 3)))
+
+    def test_unhashable_combined_values(self):
+        p = NamedTupleHelper('ListKey', 'ids')([1, 2])
+        Key = NamedTupleHelper('ListsKey', 'names', combines=(p,))
+        self.assertListEqual(Key(['a']).ids, [1, 2])
+
+    def test_threads(self):
+        classes = []
+
+        def make():
+            classes.append(type(NamedTupleHelper('ThreadKey', 'a', 'b')(1, 2)))
+
+        threads = [Thread(target=make) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(set(classes)), 1)
+        self.assertIs(classes[0], extra._cached_namedtuple('ThreadKey', ['a', 'b']))
+
+    def test_class_cache_is_bounded(self):
+        self.assertEqual(extra._tuple_class.cache_info().maxsize, extra.MAX_CACHED_TUPLES)
+        for i in range(extra.MAX_CACHED_TUPLES + 10):
+            NamedTupleHelper('Bounded{}'.format(i), 'a')(1)
+        self.assertEqual(extra._tuple_class.cache_info().currsize, extra.MAX_CACHED_TUPLES)
+
+    def test_many(self):
+        PersonKey = NamedTupleHelper('PersonKey', 'id', 'name')
+        rows = PersonKey.make_many([('1', 'a'), {'id': '2', 'name': 'b'}])
+        self.assertListEqual(rows, [('1', 'a'), ('2', 'b')])
+        self.assertIs(type(rows[0]), type(rows[1]))
+        self.assertIs(type(rows[0]), PersonKey._get_tuple_class())
+        self.assertListEqual(PersonKey.make_many(columns={'id': [1, 2], 'name': 'ab'}),
+                [(1, 'a'), (2, 'b')])
+        # columns in a different order
+        self.assertListEqual(PersonKey.make_many(columns={'name': 'ab', 'id': [1, 2]}),
+                [(1, 'a'), (2, 'b')])
+        self.assertIsNone(PersonKey._instance)
+
+        EmployeeKey = NamedTupleHelper('EmployeeKey', 'employee_no',
+                combines=(PersonKey('Id', 'Name'),))
+        rows = EmployeeKey.make_many(columns={'employee_no': [1, 2]})
+        self.assertListEqual([r._asdict() for r in rows], [
+            {'employee_no': 1, 'id': 'Id', 'name': 'Name'},
+            {'employee_no': 2, 'id': 'Id', 'name': 'Name'}])
+        self.assertListEqual(EmployeeKey.make_many([(3,), {'employee_no': 4, 'id': 'I'}]),
+                [(3, 'Id', 'Name'), (4, 'I', 'Name')])
+
+    def test_iter_many(self):
+        PersonKey = NamedTupleHelper('PersonKey', 'id', 'name')
+        rows = PersonKey.iter_many(('{}'.format(i), 'name') for i in range(3))
+        self.assertEqual(next(rows), ('0', 'name'))
+        self.assertEqual(len(list(rows)), 2)
+        self.assertRaises(ValueError, PersonKey.make_many)
+        self.assertRaises(ValueError, PersonKey.make_many, [], {})
+        self.assertRaises(ValueError, PersonKey.make_many, columns={'id': [1],
+            'name': [1, 2]})
+        # checked before iterating
+        self.assertRaises(ValueError, PersonKey.iter_many, rows=[], columns={})
+        self.assertRaises(ValueError, PersonKey.iter_many, columns={'id': [1],
+            'name': (n for n in range(2))})
+        self.assertListEqual(list(PersonKey.iter_many(columns={'id': iter([1, 2]),
+            'name': 'ab'})), [(1, 'a'), (2, 'b')])
+
+    def test_many_threads(self):
+        PersonKey = NamedTupleHelper('PersonKey', 'id', 'name')
+        results = {}
+
+        def make(i):
+            results[i] = PersonKey.make_many(columns={'id': [i] * 500, 'name': range(500)})
+
+        threads = [Thread(target=make, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for i, rows in results.items():
+            self.assertTrue(all(row.id == i for row in rows))
+            self.assertListEqual([row.name for row in rows], list(range(500)))
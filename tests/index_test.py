@@ -0,0 +1,105 @@
+from unittest import TestCase
+import gc
+import weakref
+
+from proxies import index
+from proxies.core import BaseViewContext, BaseErrorHandler
+from proxies.model_view import BaseModelViewProxy, ModelViewProxy
+from proxies.schema_helper import SchemaLabelProtocol
+
+class User(SchemaLabelProtocol):
+    labels = {'id': 'Id'}
+
+
+class Admin(User):
+    labels = {'level': 'Level'}
+
+
+class TableViewContext(BaseViewContext):
+    def render(self, *args, **kwargs):
+        return '<table>{}</table>'.format(self.labels['id'])
+
+
+class ProxyIndexTestCase(TestCase):
+
+    def tearDown(self):
+        for name in list(index.models()):
+            index.remove(name)
+
+    def test_get_proxy(self):
+        proxy = index.get_proxy(User, error_handler=BaseErrorHandler())
+        self.assertIsInstance(proxy, ModelViewProxy)
+        self.assertIs(index.get_proxy(User), proxy)
+        self.assertIs(index.get_proxy(User()), proxy)
+        self.assertIs(index.lookup('User'), proxy)
+        self.assertIs(index.lookup(User), proxy)
+        # sub-classes get their own proxy
+        self.assertIsNone(index.lookup(Admin))
+        self.assertIsNot(index.get_proxy(Admin), proxy)
+        self.assertIsNone(index.lookup('Missing'))
+        self.assertRaises(TypeError, index.get_proxy, object, proxy_class=BaseModelViewProxy)
+        # nothing is set on the model class
+        self.assertListEqual([k for k in vars(User) if 'proxy' in k], [])
+
+    def test_invalid_models_are_rejected_before_making_a_proxy(self):
+        made = []
+
+        class Proxy(BaseModelViewProxy):
+            def __init__(self, *args, **kwargs):
+                made.append(self)
+                super().__init__(*args, **kwargs)
+
+        for model in (object, object(), {'id': 'Id'}):
+            self.assertRaises(TypeError, index.get_proxy, model, proxy_class=Proxy)
+        self.assertListEqual(made, [])
+
+    def test_route(self):
+        proxy = index.get_proxy(User)
+        proxy.register_context('table', 'default', TableViewContext)
+        self.assertTupleEqual(index.route('User.table.default'), (proxy, 'table.default'))
+        self.assertEqual(index.render('User.table'), '<table>Id</table>')
+        self.assertEqual(index.render('User.table.default'), '<table>Id</table>')
+        self.assertRaises(KeyError, index.route, 'Missing.table')
+        self.assertRaises(ValueError, index.route, 'User')
+
+    def test_names(self):
+        proxy = index.get_proxy(User, name='people')
+        self.assertIs(index.lookup('people'), proxy)
+        other = type('User', (SchemaLabelProtocol,), {'labels': {'id': 'Id'}})
+        self.assertRaises(ValueError, index.get_proxy, other, name='people')
+        self.assertIs(index.get_proxy(other), index.lookup('User'))
+
+    def test_register_proxy(self):
+        proxy = BaseModelViewProxy(User)
+        self.assertIs(index.register_proxy(proxy), proxy)
+        self.assertIs(index.get_proxy(User), proxy)
+        self.assertRaises(ValueError, index.register_proxy, BaseModelViewProxy(User))
+
+    def test_remove(self):
+        proxy = index.get_proxy(User)
+        index.remove(User)
+        self.assertIsNone(index.lookup('User'))
+        self.assertIsNot(index.get_proxy(User), proxy)
+
+    def test_dynamic_models_are_collected(self):
+        model = type('Dynamic', (SchemaLabelProtocol,), {'labels': {'id': 'Id'}})
+        index.get_proxy(model).register_context('table', 'default', TableViewContext)
+        self.assertEqual(index.render('Dynamic.table'), '<table>Id</table>')
+        model_ref = weakref.ref(model)
+        proxy_ref = weakref.ref(index.lookup(model))
+        del model
+        gc.collect()
+        self.assertNotIn('Dynamic', index.models())
+        self.assertIsNone(model_ref())
+        self.assertIsNone(proxy_ref())
+
+    def test_proxies_live_as_long_as_their_model(self):
+        model = type('Dynamic', (SchemaLabelProtocol,), {'labels': {'id': 'Id'}})
+        proxy_ref = weakref.ref(index.get_proxy(model))
+        gc.collect()
+        self.assertIs(index.lookup(model), proxy_ref())
+        self.assertIsNotNone(proxy_ref())
+        index.remove(model)
+        gc.collect()
+        self.assertIsNone(proxy_ref())
+        self.assertIsNone(index.lookup(model))
@@ -0,0 +1,15 @@
+""" Contexts for the lazy registration tests, this module should only get imported
+    when one of them is resolved.
+"""
+from proxies.core import BaseViewContext
+
+# proxies that tests.registering_views registers with when it's imported
+proxies = []
+
+class LazyTable(BaseViewContext):
+    def render(self, *args, **kwargs):
+        return '<table>lazy</table>'
+
+
+class NotAContext:
+    pass
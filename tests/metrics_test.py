@@ -0,0 +1,103 @@
+from unittest import TestCase
+from urllib.request import urlopen
+import gc
+import os
+import tempfile
+
+from proxies import metrics
+from proxies.cache import RenderCache
+from proxies.core import BaseViewContext, BaseErrorHandler
+from proxies.model_view import ModelViewProxy, model_view_proxies
+from proxies.schema_helper import SchemaLabelProtocol
+
+class Labeled(SchemaLabelProtocol):
+    labels = {'id': 'Id'}
+
+
+class PageViewContext(BaseViewContext):
+    def render(self, *args, **kwargs):
+        return 'It Worked'
+
+
+class Handler(BaseErrorHandler):
+    def handle_error(self, error):
+        return None
+
+
+MODEL = 'tests.metrics_test.Labeled'
+
+def make_proxy(**kwargs):
+    m = ModelViewProxy(Labeled, Handler(), collect_stats=True, **kwargs)
+    m.register_context('table', 'default', PageViewContext)
+    m.register_context('table', 'other', PageViewContext)
+    return m
+
+
+class MetricsTestCase(TestCase):
+
+    def test_proxies_are_tracked_weakly(self):
+        m = make_proxy()
+        self.assertIn(m, model_view_proxies())
+        del m
+        gc.collect()
+        self.assertFalse(any(p.model_class is Labeled for p in model_view_proxies()))
+
+    def test_handle_error_counts_errors(self):
+        m = make_proxy()
+        m.render('fail')
+        m.get_context('table', 'fail')
+        m.render('table.fail')
+        self.assertDictEqual(m.error_counts, {'KeyError': 3})
+
+    def test_generate_text(self):
+        cache = RenderCache()
+        a = make_proxy(render_cache=cache)
+        b = make_proxy(render_cache=cache)
+        a.render('table')
+        a.render('table')
+        b.render('table')
+        b.render('fail')
+        text = metrics.generate_text([a, b])
+        labels = 'model="{}",context="table.default",method="render"'.format(MODEL)
+        self.assertIn('# TYPE proxies_render_seconds histogram', text)
+        # the two proxies get added together
+        self.assertIn('proxies_render_seconds_count{' + labels + '} 3', text)
+        self.assertIn('proxies_render_seconds_bucket{' + labels + ',le="+Inf"} 3', text)
+        self.assertIn('proxies_errors_total{{model="{}",exception="KeyError"}} 1'\
+                .format(MODEL), text)
+        self.assertIn('proxies_registry_contexts{{model="{}",key="table"}} 4'\
+                .format(MODEL), text)
+        # the shared cache only get's counted once
+        self.assertIn('proxies_render_cache_hits_total{{model="{}"}} 2'.format(MODEL), text)
+        self.assertIn('proxies_render_cache_misses_total{{model="{}"}} 1'.format(MODEL), text)
+        self.assertIn('proxies_render_cache_hit_ratio{{model="{}"}} 0.6666'.format(MODEL),
+                text)
+        self.assertTrue(text.endswith('\n'))
+
+    def test_label_values_are_escaped(self):
+        metric = metrics.Metric('test', 'gauge', 'Test.')
+        metric.add(1, model='a"b\\c\nd')
+        self.assertEqual(list(metric.lines())[-1], 'test{model="a\\"b\\\\c\\nd"} 1')
+
+    def test_write_textfile(self):
+        m = make_proxy()
+        m.render('table')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'proxies.prom')
+            metrics.write_textfile(path, [m])
+            with open(path) as f:
+                self.assertEqual(f.read(), metrics.generate_text([m]))
+            self.assertListEqual(os.listdir(directory), ['proxies.prom'])
+
+    def test_serve(self):
+        m = make_proxy()
+        m.render('table')
+        server = metrics.serve(0)
+        try:
+            port = server.server_address[1]
+            with urlopen('http://127.0.0.1:{}/metrics'.format(port)) as response:
+                self.assertIn('text/plain', response.headers['Content-Type'])
+                self.assertIn('proxies_render_seconds_count', response.read().decode())
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -1,9 +1,17 @@
 from unittest import TestCase
+import sys
+import asyncio
+import tracemalloc
+from threading import Thread, Event
+from concurrent.futures import ProcessPoolExecutor
 
-from proxies.model_view import BaseModelViewProxy, ModelViewProxy
+from proxies.model_view import BaseModelViewProxy, ModelViewProxy, ContextRenderer
 from proxies.schema_helper import SchemaLabelProtocol
-from proxies.core import BaseViewContext, BaseErrorHandler
-from proxies.context_registry import ContextRegistry, InvalidContextError
+from proxies.core import BaseViewContext, BaseErrorHandler, FrozenError
+from proxies.context_registry import ContextRegistry, InvalidContextError, \
+        InvalidContextsError, LazyContext
+from proxies.cache import RenderCache
+from proxies.pool import ContextPool
 
 class Labeled(SchemaLabelProtocol):
     labels = {'id': 'Id', 'fn': 'First Name', 'ln': 'Last Name'}
@@ -16,6 +24,11 @@ class TestViewContext(BaseViewContext):
         return 'It Worked'
 
 
+class Handler(BaseErrorHandler):
+    def handle_error(self, error):
+        return 'Handled {}'.format(error.__class__.__name__)
+
+
 
 class BaseModelViewProxyTestCase(TestCase):
 
@@ -55,6 +68,52 @@ class BaseModelViewProxyTestCase(TestCase):
         self.assertTupleEqual(m.registerys['table'].values(), 
                 (TestViewContext, TestViewContext))
 
+    def test_register_context_by_import_path(self):
+        sys.modules.pop('tests.lazy_views', None)
+        m = BaseModelViewProxy(Labeled)
+        m.register_context('table', 'lazy', 'tests.lazy_views:LazyTable')
+        m.register_context('table', 'broken', 'tests.lazy_views:Missing')
+        self.assertNotIn('tests.lazy_views', sys.modules)
+        self.assertEqual(m.render('table.lazy'), '<table>lazy</table>')
+        self.assertIs(m.get_context('table.lazy'), sys.modules['tests.lazy_views'].LazyTable)
+        self.assertRaises(InvalidContextError, m.render, 'table.broken')
+        self.assertRaises(InvalidContextError, m.preload)
+        self.assertRaises(InvalidContextError, m.register_context, 'table', 'x', 'invalid')
+
+    def test_register_contexts(self):
+        m = BaseModelViewProxy(Labeled)
+        m.register_context('table', 'default', TestViewContext)
+        generation = m._generation
+        registerys = m.registerys
+        m.register_contexts({
+            'table': {'responsive': TestViewContext},
+            'form.default': TestViewContext,
+            'list': 'tests.lazy_views:LazyTable' })
+        self.assertEqual(m._generation, generation + 1)
+        self.assertTupleEqual(m.registerys['table'].keys(), ('default', 'responsive'))
+        self.assertIs(m.get_context('form.default'), TestViewContext)
+        self.assertEqual(m.render('list'), '<table>lazy</table>')
+        # published all at once, a reader with the old registerys sees none of it
+        self.assertIsNot(m.registerys['table'], registerys['table'])
+        self.assertTupleEqual(registerys['table'].keys(), ('default',))
+
+    def test_register_contexts_is_all_or_nothing(self):
+        m = BaseModelViewProxy(Labeled)
+        with self.assertRaises(InvalidContextsError) as cm:
+            m.register_contexts({'table': {'default': TestViewContext, 'bad': NotLabeled},
+                'form.bad': 'invalid'})
+        self.assertListEqual([name for name, _ in cm.exception.errors],
+                [('table', 'bad'), ('form', 'bad')])
+        self.assertDictEqual(m.registerys, {})
+
+    def test_preload(self):
+        m = BaseModelViewProxy(Labeled)
+        m.register_context('table', 'default', TestViewContext)
+        m.register_context('table', 'lazy', 'tests.lazy_views:LazyTable')
+        m.register_context('form', 'lazy', 'tests.lazy_views:LazyTable')
+        self.assertEqual(m.preload(), 2)
+        self.assertEqual(m.preload(), 0)
+
     def test_get_context_method(self):
         m = BaseModelViewProxy(Labeled)
         m.register_context('table', 'default', TestViewContext)
@@ -142,9 +201,537 @@ class ModelViewProxyTestCase(TestCase):
         m = ModelViewProxy(Labeled, BaseErrorHandler()) 
         self.assertRaises(KeyError, m.render, 'test', 'default')
 
+    def test_lazy_context_errors_get_handled(self):
+        m = ModelViewProxy(Labeled, BaseErrorHandler())
+        m.register_context('table', 'broken', 'tests.lazy_views:Missing')
+        self.assertRaises(InvalidContextError, m.preload)
+        self.assertRaises(InvalidContextError, m.get_context, 'table.broken')
+        self.assertEqual(m.error_counts['InvalidContextError'], 2)
+
+    def test_register_contexts_errors_get_handled(self):
+        m = ModelViewProxy(Labeled, BaseErrorHandler())
+        self.assertRaises(InvalidContextsError, m.register_contexts, {'a.b': None, 'c': {}})
+        self.assertEqual(m.error_counts, {'InvalidContextsError': 1})
+
     def test_we_get_a_base_error_handler_if_not_passed_in(self):
         m = ModelViewProxy(Labeled) 
         self.assertIsInstance(m.error_handler, BaseErrorHandler)
 
 
 
+
+class CountingViewContext(BaseViewContext):
+    calls = 0
+
+    def render(self, *args, **kwargs):
+        CountingViewContext.calls += 1
+        return 'Rendered {} {}'.format(args, sorted(kwargs.items()))
+
+
+class RenderCacheTestCase(TestCase):
+
+    def setUp(self):
+        CountingViewContext.calls = 0
+
+    def test_render_output_is_cached(self):
+        m = BaseModelViewProxy(Labeled, render_cache=RenderCache())
+        m.register_context('test', 'default', CountingViewContext)
+        self.assertEqual(m.render('test.default', 1, a=2), m.render('test', 1, a=2))
+        self.assertEqual(CountingViewContext.calls, 1)
+        m.render('test.default', 2)
+        self.assertEqual(CountingViewContext.calls, 2)
+        self.assertEqual(m.render_cache.stats()['hits'], 1)
+        # unhashable args don't get cached
+        m.render('test', [])
+        m.render('test', [])
+        self.assertEqual(CountingViewContext.calls, 4)
+        # only string renders get cached
+        m.render(CountingViewContext)
+        m.render(CountingViewContext)
+        self.assertEqual(CountingViewContext.calls, 6)
+
+    def test_register_context_invalidates_the_cache(self):
+        m = BaseModelViewProxy(Labeled, render_cache=RenderCache())
+        m.register_context('test', 'default', CountingViewContext)
+        m.render('test')
+        m.register_context('test', 'default', TestViewContext)
+        self.assertEqual(m.render('test'), 'It Worked')
+
+    def test_label_changes_miss_the_cache(self):
+        class Changing(SchemaLabelProtocol):
+            labels = {'id': 'Id'}
+
+        class LabelsViewContext(BaseViewContext):
+            def render(self):
+                return ','.join(self.labels.values())
+
+        m = BaseModelViewProxy(Changing, render_cache=RenderCache())
+        m.register_context('test', 'default', LabelsViewContext)
+        self.assertEqual(m.render('test'), 'Id')
+        Changing.labels['id'] = 'NEW'
+        self.assertEqual(m.render('test'), 'NEW')
+        self.assertEqual(m.render('test'), 'NEW')
+        self.assertEqual(m.render_cache.stats()['hits'], 1)
+
+    def test_contexts_can_opt_out(self):
+        class Uncacheable(BaseViewContext):
+            cacheable = False
+            render = CountingViewContext.render
+
+        class KeyedOnNothing(BaseViewContext):
+            render = CountingViewContext.render
+
+            @classmethod
+            def cache_key(cls, *args, **kwargs):
+                return None if kwargs.get('fresh') else ()
+
+        m = ModelViewProxy(Labeled, render_cache=RenderCache())
+        m.register_context('test', 'uncacheable', Uncacheable)
+        m.register_context('test', 'keyed', KeyedOnNothing)
+        m.render('test.uncacheable')
+        m.render('test.uncacheable')
+        self.assertEqual(CountingViewContext.calls, 2)
+        m.render('test.keyed', 1)
+        m.render('test.keyed', 2)
+        self.assertEqual(CountingViewContext.calls, 3)
+        m.render('test.keyed', fresh=True)
+        self.assertEqual(CountingViewContext.calls, 4)
+
+class InstanceViewContext(BaseViewContext):
+    instances = 0
+
+    def __init__(self, *args, **kwargs):
+        InstanceViewContext.instances += 1
+        super().__init__(*args, **kwargs)
+
+    def render(self, *args, **kwargs):
+        return id(self)
+
+
+class ContextPoolTestCase(TestCase):
+
+    def setUp(self):
+        InstanceViewContext.instances = 0
+
+    def test_render_reuses_pooled_instances(self):
+        m = BaseModelViewProxy(Labeled, context_pool=ContextPool())
+        m.register_context('test', 'default', InstanceViewContext)
+        first = m.render('test')
+        self.assertEqual(m.render('test'), first)
+        self.assertEqual(m.render(InstanceViewContext), first)
+        self.assertEqual(InstanceViewContext.instances, 1)
+
+    def test_nested_renders_get_their_own_instance(self):
+        class NestedViewContext(BaseViewContext):
+            def render(self, proxy, depth=0):
+                if depth == 0:
+                    return [id(self)]
+                return [id(self)] + proxy.render('test', proxy, depth=depth - 1)
+
+        m = BaseModelViewProxy(Labeled, context_pool=ContextPool())
+        m.register_context('test', 'default', NestedViewContext)
+        ids = m.render('test', m, depth=2)
+        self.assertEqual(len(set(ids)), 3)
+        self.assertListEqual(m.render('test', m, depth=2), ids)
+
+    def test_register_context_clears_the_pool(self):
+        m = BaseModelViewProxy(Labeled, context_pool=ContextPool())
+        m.register_context('test', 'default', InstanceViewContext)
+        m.render('test')
+        m.register_context('test', 'default', InstanceViewContext)
+        m.render('test')
+        self.assertEqual(InstanceViewContext.instances, 2)
+
+    def test_label_changes_clear_the_pool(self):
+        class Model(SchemaLabelProtocol):
+            labels = {'id': 'Id'}
+
+        m = BaseModelViewProxy(Model, context_pool=ContextPool())
+        m.register_context('test', 'default', InstanceViewContext)
+        m.render('test')
+        m.render('test')
+        self.assertEqual(InstanceViewContext.instances, 1)
+        Model.labels['id'] = 'New Id'
+        m.render('test')
+        self.assertEqual(InstanceViewContext.instances, 2)
+        self.assertEqual(m.init_context('test', 'default').labels['id'], 'New Id')
+
+
+    def test_plain_dict_labels_keep_the_pool(self):
+        class Model(SchemaLabelProtocol):
+            labels = {'id': 'Id'}
+
+        Model.labels.maps.append({'fn': 'First Name'})
+        m = BaseModelViewProxy(Model, context_pool=ContextPool())
+        m.register_context('test', 'default', InstanceViewContext)
+        m.render('test')
+        m.render('test')
+        self.assertEqual(InstanceViewContext.instances, 1)
+        Model.labels.maps[-1]['fn'] = 'Name'
+        m.render('test')
+        self.assertEqual(InstanceViewContext.instances, 2)
+
+
+class ContextRendererTestCase(TestCase):
+
+    def test_get_renderer(self):
+        m = BaseModelViewProxy(Labeled)
+        m.register_context('test', 'default', TestViewContext)
+        r = m.get_renderer('test.default')
+        self.assertIsInstance(r, ContextRenderer)
+        self.assertEqual(r(), 'It Worked')
+        self.assertEqual(m.get_renderer('test')(), 'It Worked')
+        self.assertEqual(m.get_renderer(TestViewContext)(), 'It Worked')
+        self.assertRaises(KeyError, m.get_renderer, 'fail')
+        self.assertRaises(KeyError, m.get_renderer, 'test.fail')
+
+    def test_renderer_resolves_again_after_register_context(self):
+        m = BaseModelViewProxy(Labeled)
+        m.register_context('test', 'default', TestViewContext)
+        r = m.get_renderer('test')
+        m.register_context('test', 'default', CountingViewContext)
+        self.assertEqual(r(1), 'Rendered (1,) []')
+        self.assertEqual(r.context, CountingViewContext)
+
+    def test_renderer_errors_get_handled(self):
+        m = ModelViewProxy(Labeled, Handler())
+        self.assertEqual(m.get_renderer('fail'), 'Handled KeyError')
+        m.register_context('test', 'default', BaseViewContext)
+        self.assertEqual(m.get_renderer('test')(), 'Handled NotImplementedError')
+
+
+class TableViewContext(BaseViewContext):
+
+    def render_iter(self, rows):
+        yield '<table>'
+        for row in rows:
+            yield '<tr><td>{}</td></tr>'.format(row)
+        yield '</table>'
+
+
+class RenderIterTestCase(TestCase):
+
+    def test_render_iter(self):
+        m = BaseModelViewProxy(Labeled)
+        m.register_context('table', 'default', TableViewContext)
+        m.register_context('test', 'default', TestViewContext)
+        self.assertEqual(''.join(m.render_iter('table', range(2))),
+                '<table><tr><td>0</td></tr><tr><td>1</td></tr></table>')
+        # falls back to render as one chunk
+        self.assertListEqual(list(m.render_iter('test')), ['It Worked'])
+        self.assertListEqual(list(m.render_iter(TestViewContext)), ['It Worked'])
+        self.assertRaises(KeyError, m.render_iter, 'fail')
+
+    def test_render_iter_memory_is_bounded(self):
+        m = BaseModelViewProxy(Labeled)
+        m.register_context('table', 'default', TableViewContext)
+
+        def peak(count):
+            tracemalloc.start()
+            try:
+                for chunk in m.render_iter('table', range(count)):
+                    pass
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        small = peak(1000)
+        large = peak(50000)
+        # the rendered table grows 50x, peak memory should not
+        self.assertLess(large, small * 2 + 10000)
+
+    def test_render_iter_errors_get_handled(self):
+        class FailingViewContext(BaseViewContext):
+            def render_iter(self):
+                yield 'first'
+                raise ValueError()
+
+        m = ModelViewProxy(Labeled, Handler())
+        m.register_context('test', 'default', FailingViewContext)
+        self.assertEqual(m.render_iter('fail'), 'Handled KeyError')
+        self.assertListEqual(list(m.render_iter('test')), ['first', 'Handled ValueError'])
+        self.assertRaises(ValueError, list, ModelViewProxy(Labeled).render_iter(FailingViewContext))
+
+
+class AsyncViewContext(BaseViewContext):
+
+    async def render(self, name='Async', delay=0):
+        await asyncio.sleep(delay)
+        return '{} Worked'.format(name)
+
+
+class ArenderTestCase(TestCase):
+
+    def setUp(self):
+        CountingViewContext.calls = 0
+
+    def test_arender(self):
+        m = BaseModelViewProxy(Labeled)
+        m.register_context('test', 'default', TestViewContext)
+        m.register_context('test', 'async', AsyncViewContext)
+        self.assertEqual(asyncio.run(m.arender('test')), 'It Worked')
+        self.assertEqual(asyncio.run(m.arender('test.async')), 'Async Worked')
+        self.assertEqual(asyncio.run(m.arender(AsyncViewContext, 'Class')), 'Class Worked')
+        self.assertRaises(KeyError, asyncio.run, m.arender('fail'))
+
+    def test_arender_all_runs_concurrently(self):
+        m = BaseModelViewProxy(Labeled)
+        m.register_context('test', 'default', TestViewContext)
+        m.register_context('test', 'async', AsyncViewContext)
+
+        async def page():
+            # would take 1 second if the async contexts ran one after another
+            return await asyncio.wait_for(m.arender_all(
+                    'test',
+                    ('test.async', ('A', 0.5)),
+                    ('test.async', (), {'name': 'B', 'delay': 0.5})), 0.9)
+
+        self.assertListEqual(asyncio.run(page()), ['It Worked', 'A Worked', 'B Worked'])
+
+    def test_arender_all_bad_specs(self):
+        m = BaseModelViewProxy(Labeled)
+        m.register_context('test', 'default', TestViewContext)
+        for spec in (('test',), ('test', (), {}, 'extra')):
+            with self.assertRaises(TypeError) as e:
+                asyncio.run(m.arender_all('test', spec))
+            self.assertIn(repr(spec), str(e.exception))
+
+    def test_arender_uses_the_render_cache(self):
+        m = BaseModelViewProxy(Labeled, render_cache=RenderCache())
+        m.register_context('test', 'default', CountingViewContext)
+        asyncio.run(m.arender('test'))
+        self.assertEqual(asyncio.run(m.arender('test')), m.render('test'))
+        self.assertEqual(CountingViewContext.calls, 1)
+
+    def test_arender_errors_get_handled(self):
+        m = ModelViewProxy(Labeled, Handler())
+        self.assertEqual(asyncio.run(m.arender('fail')), 'Handled KeyError')
+        self.assertListEqual(asyncio.run(m.arender_all('fail', BaseViewContext)),
+                ['Handled KeyError', 'Handled NotImplementedError'])
+
+
+class OtherViewContext(BaseViewContext):
+    def render(self, *args, **kwargs):
+        return 'Other Worked'
+
+
+class ThreadSafetyTestCase(TestCase):
+
+    def test_render_while_registrations_churn(self):
+        m = BaseModelViewProxy(Labeled, render_cache=RenderCache(maxsize=8))
+        m.register_context('test', 'default', TestViewContext)
+        m.register_context('test', 'other', OtherViewContext)
+        renderer = m.get_renderer('test.default')
+        stop = Event()
+        errors = []
+        outputs = set()
+
+        def read():
+            try:
+                while not stop.is_set():
+                    outputs.add(m.render('test'))
+                    outputs.add(m.render('test.other'))
+                    outputs.add(renderer())
+                    m.registerys['test'].keys()
+            except Exception as e:
+                errors.append(e)
+
+        def write(number):
+            try:
+                for i in range(2000):
+                    context = (TestViewContext, OtherViewContext)[i % 2]
+                    m.register_context('test', 'default', context)
+                    m.register_context('test', 'other', context)
+                    m.register_context('test{}_{}'.format(number, i % 50), 'default', context)
+            except Exception as e:
+                errors.append(e)
+
+        readers = [Thread(target=read) for _ in range(4)]
+        writers = [Thread(target=write, args=(n,)) for n in range(2)]
+        # switch threads as often as possible, to give races a chance to show up
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for t in readers + writers:
+                t.start()
+            for t in writers:
+                t.join()
+            stop.set()
+            for t in readers:
+                t.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        self.assertListEqual(errors, [])
+        self.assertTrue(outputs <= {'It Worked', 'Other Worked'})
+        self.assertEqual(len(m.registerys), 101)
+        self.assertTupleEqual(m.registerys['test'].keys(), ('default', 'other'))
+        # the last registration wins, and the cache does not hold on to older output
+        self.assertEqual(m.render('test'), 'Other Worked')
+        self.assertEqual(renderer(), 'Other Worked')
+
+
+class RowsViewContext(BaseViewContext):
+
+    def render_rows(self, rows, cell='td'):
+        return ''.join('<tr><{0}>{1}</{0}></tr>'.format(cell, self.labels['id'] + str(row)) \
+                for row in rows)
+
+    def join_fragments(self, fragments, cell='td'):
+        return '<table>' + ''.join(fragments) + '</table>'
+
+
+class RenderParallelTestCase(TestCase):
+
+    def test_render_parallel(self):
+        m = BaseModelViewProxy(Labeled)
+        m.register_context('table', 'default', RowsViewContext)
+        context = m.init_context('table', 'default')
+        expected = context.join_fragments([context.render_rows(range(35), cell='th')])
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            self.assertEqual(m.render_parallel('table', range(35), chunk_size=10,
+                executor=executor, cell='th'), expected)
+            self.assertEqual(m.render_parallel(RowsViewContext, [], executor=executor),
+                    '<table></table>')
+        self.assertEqual(m.render_parallel('table', range(35), cell='th', max_workers=2,
+            chunk_size=4), expected)
+        # would otherwise render nothing
+        self.assertRaises(ValueError, m.render_parallel, 'table', range(35), chunk_size=0)
+
+    def test_render_parallel_errors_get_handled(self):
+        m = ModelViewProxy(Labeled, Handler())
+        m.register_context('test', 'default', TestViewContext)
+        self.assertEqual(m.render_parallel('fail', range(3)), 'Handled KeyError')
+        self.assertEqual(m.render_parallel('test', range(3), max_workers=1),
+                'Handled NotImplementedError')
+
+
+class StatsTestCase(TestCase):
+
+    def test_stats_are_off_by_default(self):
+        m = BaseModelViewProxy(Labeled)
+        m.register_context('test', 'default', TestViewContext)
+        m.render('test')
+        self.assertDictEqual(m.stats(), {})
+
+    def test_render_and_init_context_stats(self):
+        m = BaseModelViewProxy(Labeled, collect_stats=True)
+        m.register_context('test', 'default', TestViewContext)
+        m.render('test')
+        m.render('test.default')
+        m.get_renderer('test')()
+        m.render(TestViewContext)
+        m.init_context('test', 'default')
+        self.assertRaises(NotImplementedError, m.render, BaseViewContext(model=Labeled))
+        stats = m.stats()
+        self.assertEqual(stats['render']['test.default']['count'], 3)
+        self.assertEqual(stats['render']['TestViewContext']['count'], 1)
+        self.assertEqual(stats['render']['BaseViewContext']['count'], 1)
+        self.assertEqual(stats['init_context']['test.default']['count'], 1)
+        self.assertGreater(stats['render']['test.default']['max'], 0)
+
+        m.reset_stats()
+        self.assertDictEqual(m.stats(), {})
+        m.collect_stats = False
+        m.render('test')
+        self.assertDictEqual(m.stats(), {})
+
+
+class OrderedViewContext(BaseViewContext):
+    label_order = {'ln': 0, 'id': -1}
+
+    def render(self, *args, **kwargs):
+        return ','.join(self.labels)
+
+
+class FreezeTestCase(TestCase):
+
+    def make_proxy(self, proxy_class=BaseModelViewProxy, **kwargs):
+        m = proxy_class(Labeled, **kwargs)
+        m.register_context('table', 'default', OrderedViewContext)
+        m.register_context('table', 'other', TestViewContext)
+        m.register_context('form', 'lazy', 'tests.lazy_views:LazyTable')
+        return m
+
+    def test_freeze(self):
+        m = self.make_proxy()
+        self.assertIs(m.freeze(), m)
+        self.assertTrue(m.frozen)
+        self.assertIs(m.freeze(), m)
+        self.assertEqual(m.render('table'), 'ln,fn,id')
+        self.assertEqual(m.render('table.default'), 'ln,fn,id')
+        self.assertEqual(m.render('table', 'other'), 'ln,fn,id')
+        self.assertEqual(m.render('table.other'), 'It Worked')
+        self.assertEqual(m.render('form.lazy'), '<table>lazy</table>')
+        self.assertEqual(m.render(TestViewContext), 'It Worked')
+        self.assertEqual(m.get_renderer('table.default')(), 'ln,fn,id')
+        self.assertEqual(m.init_context('table', 'default').render(), 'ln,fn,id')
+        self.assertTupleEqual(m._resolved['table'], ('table', 'default', OrderedViewContext))
+        # registered lazily, but resolved when frozen
+        self.assertNotIsInstance(m.registerys['form']._contexts['lazy'], LazyContext)
+        # errors are the same as before
+        self.assertRaises(KeyError, m.render, 'missing')
+        self.assertRaises(KeyError, m.render, 'table.missing')
+        self.assertRaises(ValueError, m.render, 'form')
+
+    def test_freeze_with_a_module_that_registers_on_import(self):
+        m = self.make_proxy()
+        m.register_context('table', 'registering', 'tests.registering_views:RegisteringTable')
+        sys.modules.pop('tests.registering_views', None)
+        from tests import lazy_views
+        lazy_views.proxies.append(m)
+        try:
+            thread = Thread(target=m.freeze, daemon=True)
+            thread.start()
+            thread.join(5)
+            self.assertFalse(thread.is_alive(), 'freeze deadlocked')
+        finally:
+            lazy_views.proxies.remove(m)
+        self.assertTrue(m.frozen)
+        self.assertEqual(m.render('table.registering'), '<table>registering</table>')
+        # registered while preloading, and resolved too
+        self.assertNotIsInstance(m.registerys['form']._contexts['registered'], LazyContext)
+
+    def test_contexts_get_their_own_labels(self):
+        m = self.make_proxy().freeze()
+        a = m.init_context('table', 'default')
+        b = m.init_context('table', 'default')
+        self.assertIsNot(a.labels, b.labels)
+        a.labels['extra'] = 'Extra'
+        self.assertNotIn('extra', b.labels)
+        self.assertNotIn('extra', m.init_context('table', 'default').labels)
+        # a label_order passed in still get's used
+        c = m.init_context('table', 'default', label_order={'id': 0})
+        self.assertListEqual(list(c.labels), ['id', 'fn', 'ln'])
+
+    def test_mutation_raises(self):
+        m = self.make_proxy().freeze()
+        self.assertRaises(FrozenError, m.register_context, 'table', 'new', TestViewContext)
+        self.assertRaises(FrozenError, m.register_context, 'new', 'default', TestViewContext)
+        self.assertRaises(FrozenError, m.register_contexts, {'new': TestViewContext})
+        self.assertRaises(FrozenError, m.registerys.__setitem__, 'new', ContextRegistry())
+        self.assertRaises(FrozenError, m.registerys.update, {})
+        registry = m.registerys['table']
+        self.assertRaises(FrozenError, registry.__setitem__, 'new', TestViewContext)
+        self.assertRaises(FrozenError, registry.__delitem__, 'other')
+        self.assertRaises(FrozenError, registry.update, {'new': TestViewContext})
+        self.assertTupleEqual(registry.keys(), ('default', 'other'))
+
+        m = self.make_proxy(ModelViewProxy, error_handler=BaseErrorHandler()).freeze()
+        self.assertRaises(FrozenError, m.register_context, 'table', 'new', TestViewContext)
+        self.assertEqual(m.error_counts, {'FrozenError': 1})
+
+    def test_labels_are_from_when_frozen(self):
+        class Changing(SchemaLabelProtocol):
+            labels = {'id': 'Id'}
+
+        class LabelsViewContext(BaseViewContext):
+            def render(self):
+                return ','.join(self.labels)
+
+        m = BaseModelViewProxy(Changing)
+        m.register_context('table', 'default', LabelsViewContext)
+        m.freeze()
+        Changing.labels['ln'] = 'Last Name'
+        self.assertEqual(m.render('table'), 'id')
+        self.assertEqual(BaseModelViewProxy(Changing).render(LabelsViewContext), 'id,ln')
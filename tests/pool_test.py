@@ -0,0 +1,43 @@
+from unittest import TestCase
+from threading import Thread
+
+from proxies.core import BaseViewContext
+from proxies.pool import ContextPool
+
+class ResetViewContext(BaseViewContext):
+    resets = 0
+
+    def reset(self):
+        ResetViewContext.resets += 1
+
+
+class ContextPoolTestCase(TestCase):
+
+    def setUp(self):
+        ResetViewContext.resets = 0
+
+    def test_acquire_and_release(self):
+        p = ContextPool()
+        self.assertIsNone(p.acquire('a'))
+        c = ResetViewContext(model={})
+        p.release('a', c)
+        self.assertEqual(ResetViewContext.resets, 1)
+        self.assertIs(p.acquire('a'), c)
+        # only one render get's an instance at a time
+        self.assertIsNone(p.acquire('a'))
+
+    def test_clear(self):
+        p = ContextPool()
+        p.release('a', ResetViewContext(model={}))
+        p.clear()
+        self.assertIsNone(p.acquire('a'))
+
+    def test_instances_are_per_thread(self):
+        p = ContextPool()
+        p.release('a', ResetViewContext(model={}))
+        rv = []
+        t = Thread(target=lambda: rv.append(p.acquire('a')))
+        t.start()
+        t.join()
+        self.assertListEqual(rv, [None])
+        self.assertIsNotNone(p.acquire('a'))
@@ -0,0 +1,92 @@
+from unittest import TestCase
+import os
+import time
+import pstats
+import tempfile
+import shutil
+
+from proxies.core import BaseViewContext
+from proxies.model_view import ModelViewProxy
+from proxies.profiling import RenderProfiler
+from proxies.schema_helper import SchemaLabelProtocol
+
+class Labeled(SchemaLabelProtocol):
+    labels = {'id': 'Id'}
+
+
+class SleepViewContext(BaseViewContext):
+    def render(self, seconds=0):
+        if seconds:
+            time.sleep(seconds)
+        return '<table></table>'
+
+
+class RenderProfilerTestCase(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def make_proxy(self, **kwargs):
+        profiler = RenderProfiler(self.directory, **kwargs)
+        m = ModelViewProxy(Labeled, profiler=profiler)
+        m.register_context('table', 'default', SleepViewContext)
+        return m, profiler
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, RenderProfiler, self.directory)
+        self.assertRaises(ValueError, RenderProfiler, self.directory, threshold=1,
+                max_files=0)
+
+    def test_threshold_arms_next_render(self):
+        m, profiler = self.make_proxy(threshold=0.01)
+        self.assertEqual(m.render('table'), '<table></table>')
+        # slow, but nothing was profiling it
+        m.render('table', 0.02)
+        self.assertListEqual(profiler.files(), [])
+        # armed, but fast so not written
+        m.render('table')
+        self.assertListEqual(profiler.files(), [])
+        m.render('table', 0.02)
+        m.render('table', 0.02)
+        path, = profiler.files()
+        self.assertIn('tests.profiling_test.Labeled_table.default_', os.path.basename(path))
+        stats = pstats.Stats(path)
+        self.assertTrue(any(func[2] == 'render' for func in stats.stats))
+
+    def test_sampling(self):
+        m, profiler = self.make_proxy(sample_rate=0.5, random=iter([0.9, 0.1]).__next__)
+        m.render('table')
+        self.assertEqual(profiler.captures, 0)
+        m.render('table')
+        self.assertEqual(profiler.captures, 1)
+
+    def test_max_files(self):
+        m, profiler = self.make_proxy(sample_rate=1.0, max_files=3)
+        for _ in range(5):
+            m.render('table')
+        self.assertEqual(profiler.captures, 5)
+        self.assertEqual(len(profiler.files()), 3)
+
+    def test_trace_memory(self):
+        m, profiler = self.make_proxy(sample_rate=1.0, trace_memory=True)
+        m.render('table')
+        names = os.listdir(self.directory)
+        self.assertEqual(len(names), 2)
+        memory, = [n for n in names if n.endswith('.tracemalloc.txt')]
+        with open(os.path.join(self.directory, memory)) as f:
+            self.assertIn('table.default took', f.readline())
+
+    def test_nested_renders_are_not_profiled_twice(self):
+        m, profiler = self.make_proxy(sample_rate=1.0)
+
+        class PageViewContext(BaseViewContext):
+            def render(self):
+                return m.render('table')
+
+        m.register_context('page', 'default', PageViewContext)
+        self.assertEqual(m.render('page'), '<table></table>')
+        path, = profiler.files()
+        self.assertIn('page.default', path)
@@ -0,0 +1,13 @@
+""" Contexts for the freeze tests, importing this module registers a context with every
+    proxy in lazy_views.proxies (like an app registering it's views on import).
+"""
+from proxies.core import BaseViewContext
+from tests import lazy_views
+
+class RegisteringTable(BaseViewContext):
+    def render(self, *args, **kwargs):
+        return '<table>registering</table>'
+
+
+for proxy in lazy_views.proxies:
+    proxy.register_context('form', 'registered', 'tests.lazy_views:LazyTable')
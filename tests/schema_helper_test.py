@@ -129,3 +129,161 @@ class SchemaLabelProtocolTestCase(TestCase):
         # if updated after class creation it doesn't reflect on sub-classes
         Test.labels.update({'id': 'Id'})
         self.assertNotEqual(Test2.labels['id'], Test.labels['id'])
+
+
+class SchemaMapSnapshotTestCase(TestCase):
+
+    def test_schema_key_changes_bump_version(self):
+        key = SchemaKey(id='Id')
+        version = key._version
+        key['fn'] = 'First Name'
+        key.update({'ln': 'Last Name'})
+        del key['fn']
+        key.pop('ln')
+        self.assertEqual(key._version, version + 4)
+        self.assertIsInstance(key.copy(), SchemaKey)
+
+    def test_snapshot_is_flattened_and_read_only(self):
+        t_map = SchemaMap(SchemaKey(id='New Id'), SchemaKey(id='Id', fn='First Name'))
+        snapshot = t_map.snapshot()
+        self.assertDictEqual(dict(snapshot), {'id': 'New Id', 'fn': 'First Name'})
+        self.assertListEqual(list(snapshot), list(t_map))
+        def set_item():
+            snapshot['id'] = 'fails'
+        self.assertRaises(TypeError, set_item)
+
+    def test_snapshot_is_reused_until_a_map_changes(self):
+        t_id = SchemaKey(id='Id')
+        t_map = SchemaMap(t_id).new_child()
+        snapshot = t_map.snapshot()
+        self.assertIs(t_map.snapshot(), snapshot)
+
+        t_id['id'] = 'New Id'
+        self.assertEqual(t_map.snapshot()['id'], 'New Id')
+        snapshot = t_map.snapshot()
+
+        t_map['id'] = 'Child Id'
+        self.assertEqual(t_map.snapshot()['id'], 'Child Id')
+        snapshot = t_map.snapshot()
+
+        t_map.maps.append(SchemaKey(email='Email'))
+        self.assertEqual(t_map.snapshot()['email'], 'Email')
+
+    def test_plain_dicts_are_referenced(self):
+        t_id = {'id': 'Id'}
+        t_map = SchemaMap(t_id).new_child({'fn': 'First Name'})
+        self.assertIs(t_map.maps[1], t_id)
+        self.assertIsNone(t_map.version)
+        snapshot = t_map.snapshot()
+        self.assertIs(t_map.snapshot(), snapshot)
+        t_id['id'] = 'New Id'
+        self.assertEqual(t_map['id'], 'New Id')
+        self.assertEqual(t_map.snapshot()['id'], 'New Id')
+        t_map['id'] = 'Child Id'
+        self.assertEqual(t_map.snapshot()['id'], 'Child Id')
+
+    def test_snapshot_with_plain_dicts_is_always_current(self):
+        t_id = {'id': 'Id'}
+        t_map = SchemaMap()
+        t_map.maps.append(t_id)
+        self.assertIsNone(t_map.version)
+        snapshot = t_map.snapshot()
+        self.assertEqual(snapshot['id'], 'Id')
+        # the same view while nothing changed
+        self.assertIs(t_map.snapshot(), snapshot)
+        t_id['id'] = 'New Id'
+        self.assertEqual(t_map.snapshot()['id'], 'New Id')
+
+    def test_class_labels_snapshot(self):
+        class Test(Labels):
+            pass
+
+        self.assertDictEqual(dict(Test.labels.snapshot()), dict(Labels.labels))
+        self.assertIsNotNone(Test.labels.version)
+        Test.labels['id'] = 'Test Id'
+        self.assertEqual(Test.labels.snapshot()['id'], 'Test Id')
+
+    def test_schema_map_pickles(self):
+        import pickle
+        t_map = SchemaMap(SchemaKey(id='Id'))
+        t_map.snapshot()
+        loaded = pickle.loads(pickle.dumps(t_map))
+        self.assertIsInstance(loaded, SchemaMap)
+        self.assertDictEqual(dict(loaded.snapshot()), {'id': 'Id'})
+
+
+class SchemaLabelInheritanceTestCase(TestCase):
+
+    def test_later_bases_win(self):
+        class Base(SchemaLabelProtocol):
+            labels = {'id': 'Base Id'}
+
+        class Mixin(SchemaLabelProtocol):
+            labels = {'id': 'Mixin Id', 'fn': 'First Name'}
+
+        class Sub(Base, Mixin):
+            labels = {'ln': 'Last Name'}
+
+        self.assertEqual(Sub.labels['id'], 'Mixin Id')
+        self.assertDictEqual(dict(Sub.labels.snapshot()),
+                {'id': 'Mixin Id', 'fn': 'First Name', 'ln': 'Last Name'})
+
+    def test_base_labels_are_copied(self):
+        class Base(SchemaLabelProtocol):
+            labels = {'id': 'Id'}
+
+        class Sub(Base):
+            labels = {'ln': 'Last Name'}
+
+        Base.labels['id'] = 'Changed Id'
+        self.assertEqual(Sub.labels['id'], 'Id')
+        # sub-class changes stay on the sub-class
+        Sub.labels['id'] = 'Sub Id'
+        self.assertEqual(Base.labels['id'], 'Changed Id')
+
+    def test_late_base_changes_are_not_inherited(self):
+        class Base(SchemaLabelProtocol):
+            labels = {'bx': 'bx'}
+
+        Base.labels['bx'] = 'changed bx'
+
+        class Sub(Base):
+            labels = {'ln': 'Last Name'}
+
+        self.assertEqual(Base.labels['bx'], 'changed bx')
+        self.assertEqual(Sub.labels['bx'], 'bx')
+
+    def test_base_maps_are_referenced(self):
+        class Base(SchemaLabelProtocol):
+            labels = {'id': 'Id'}
+
+        class Mixin(Base):
+            labels = {'fn': 'First Name'}
+
+        class Sub(Mixin, Base):
+            labels = {'ln': 'Last Name'}
+
+        declared = Base.labels.maps[-1]
+        self.assertTrue(any(_map is declared for _map in Sub.labels.maps))
+        # each map is only chained once
+        self.assertEqual(len(Sub.labels.maps), len(set(map(id, Sub.labels.maps))))
+
+    def test_declared_schema_key_changes_are_inherited(self):
+        key = SchemaKey({'id': 'Id'})
+
+        class Base(SchemaLabelProtocol):
+            labels = key
+
+        class Sub(Base):
+            labels = {'ln': 'Last Name'}
+
+        # changing the declared SchemaKey object itself (not Base.labels) shows up
+        # on sub-classes, it's map is not copied
+        key['id'] = 'Changed Id'
+        self.assertEqual(Sub.labels['id'], 'Changed Id')
+
+    def test_invalid_labels_raise(self):
+        def make():
+            class Test(SchemaLabelProtocol):
+                labels = ['id']
+        self.assertRaises(NotImplementedError, make)
@@ -0,0 +1,179 @@
+from unittest import TestCase
+import os
+import tempfile
+import multiprocessing
+
+from proxies.core import BaseViewContext
+from proxies.model_view import BaseModelViewProxy
+from proxies.schema_helper import SchemaLabelProtocol
+from proxies.shared_cache import SharedRenderCache
+
+class Labeled(SchemaLabelProtocol):
+    labels = {'id': 'Id'}
+
+
+class PidViewContext(BaseViewContext):
+    def render(self, *args, **kwargs):
+        return '<p>{}</p>'.format(os.getpid())
+
+
+def key(n, sub_key='default'):
+    return ('table', sub_key, PidViewContext, ((n,), ()), Labeled)
+
+
+def expected(n):
+    return '{}:'.format(n) + 'x' * (n % 200)
+
+
+def _set_value(path, n, value):
+    SharedRenderCache(path, slots=64).set(key(n), value)
+
+
+def _render(path):
+    proxy = BaseModelViewProxy(Labeled, render_cache=SharedRenderCache(path, slots=64))
+    proxy.register_context('table', 'default', PidViewContext)
+    return proxy.render('table')
+
+
+def _hammer(path, worker, rounds):
+    """ set and get overlapping keys, returning the number of wrong values seen """
+    cache = SharedRenderCache(path, slots=32, slot_size=512, ways=4)
+    wrong = 0
+    for i in range(rounds):
+        n = (i * 7 + worker) % 100
+        if i % 3 == 0:
+            cache.set(key(n), expected(n))
+        value = cache.get(key(n))
+        if value is not None and value != expected(n):
+            wrong += 1
+    return wrong
+
+
+class SharedRenderCacheTestCase(TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(prefix='proxies-cache-test')
+        os.close(fd)
+        os.unlink(self.path)
+        self.mp = multiprocessing.get_context('fork')
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def test_get_and_set(self):
+        cache = SharedRenderCache(self.path, slots=64)
+        self.assertIsNone(cache.get(key(1)))
+        cache.set(key(1), '<table>1</table>')
+        cache.set(key(2), {'not': 'a string'})
+        self.assertEqual(cache.get(key(1)), '<table>1</table>')
+        self.assertDictEqual(cache.get(key(2)), {'not': 'a string'})
+        cache.set(key(1), '<table>one</table>')
+        self.assertEqual(cache.get(key(1)), '<table>one</table>')
+        self.assertEqual(len(cache), 2)
+        # too large for a slot
+        cache.set(key(3), 'x' * cache.max_value_size + 'x')
+        self.assertIsNone(cache.get(key(3)))
+        # context instances are not shared
+        instance_key = ('table', 'default', PidViewContext(model=Labeled), ((), ()), Labeled)
+        cache.set(instance_key, 'instance')
+        self.assertIsNone(cache.get(instance_key))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (3, 3))
+        self.assertEqual(stats['maxsize'], 64)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_unstable_keys_are_not_shared(self):
+        cache = SharedRenderCache(self.path, slots=64)
+        for cache_key in (key(object()), key(frozenset(('a', 'b'))), key([1])):
+            cache.set(cache_key, 'unstable')
+            self.assertIsNone(cache.get(cache_key))
+        self.assertEqual(len(cache), 0)
+        # nested tuples, bytes, floats, None and classes are fine
+        stable = key((b'x', 1.5, None, True, Labeled))
+        cache.set(stable, 'stable')
+        self.assertEqual(cache.get(stable), 'stable')
+
+    def test_invalid_sizes(self):
+        self.assertRaises(ValueError, SharedRenderCache, self.path, slots=12, ways=8)
+        self.assertRaises(ValueError, SharedRenderCache, self.path, slot_size=16)
+        SharedRenderCache(self.path, slots=64)
+        self.assertRaises(ValueError, SharedRenderCache, self.path, slots=128)
+
+    def test_files_others_can_write_are_refused(self):
+        SharedRenderCache(self.path, slots=64)
+        os.chmod(self.path, 0o622)
+        self.assertRaises(PermissionError, SharedRenderCache, self.path, slots=64)
+        os.chmod(self.path, 0o600)
+        SharedRenderCache(self.path, slots=64)
+        if os.getuid() == 0:
+            # made by another user
+            os.chown(self.path, 12345, -1)
+            self.assertRaises(PermissionError, SharedRenderCache, self.path, slots=64)
+        # links are not followed
+        link = self.path + '.link'
+        os.symlink(self.path, link)
+        try:
+            self.assertRaises(OSError, SharedRenderCache, link, slots=64)
+        finally:
+            os.unlink(link)
+
+    def test_lru_eviction(self):
+        cache = SharedRenderCache(self.path, slots=4, ways=4)
+        for n in range(4):
+            cache.set(key(n), str(n))
+        cache.get(key(0))
+        cache.set(key(4), '4')
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertIsNone(cache.get(key(1)))
+        self.assertListEqual([cache.get(key(n)) for n in (0, 2, 3, 4)], ['0', '2', '3', '4'])
+
+    def test_ttl(self):
+        now = [100.0]
+        cache = SharedRenderCache(self.path, slots=8, ttl=10, timer=lambda: now[0])
+        cache.set(key(1), 'one')
+        now[0] = 109.0
+        self.assertEqual(cache.get(key(1)), 'one')
+        now[0] = 110.0
+        self.assertIsNone(cache.get(key(1)))
+        self.assertEqual(cache.stats()['expirations'], 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_invalidate(self):
+        cache = SharedRenderCache(self.path, slots=64)
+        cache.set(key(1), 'a')
+        cache.set(key(2, 'other'), 'b')
+        cache.set(('form', 'default', PidViewContext, ((1,), ()), Labeled), 'c')
+        self.assertEqual(cache.invalidate('table', 'other'), 1)
+        self.assertEqual(cache.get(key(1)), 'a')
+        self.assertEqual(cache.invalidate('table'), 1)
+        self.assertEqual(len(cache), 1)
+
+    def test_shared_between_processes(self):
+        cache = SharedRenderCache(self.path, slots=64)
+        p = self.mp.Process(target=_set_value, args=(self.path, 1, 'from the child'))
+        p.start()
+        p.join()
+        self.assertEqual(p.exitcode, 0)
+        self.assertEqual(cache.get(key(1)), 'from the child')
+
+    def test_proxy_renders_are_shared(self):
+        with self.mp.Pool(1) as pool:
+            rendered = pool.apply(_render, (self.path,))
+        self.assertNotEqual(rendered, '<p>{}</p>'.format(os.getpid()))
+        # rendered by the other process
+        self.assertEqual(_render(self.path), rendered)
+        # a worker with different labels does not get output made with the old ones
+        Labeled.labels['id'] = 'Changed Id'
+        try:
+            self.assertEqual(_render(self.path), '<p>{}</p>'.format(os.getpid()))
+        finally:
+            Labeled.labels['id'] = 'Id'
+        self.assertEqual(_render(self.path), rendered)
+
+    def test_concurrent_processes(self):
+        SharedRenderCache(self.path, slots=32, slot_size=512, ways=4)
+        with self.mp.Pool(4) as pool:
+            wrong = pool.starmap(_hammer, [(self.path, worker, 2000) for worker in range(4)])
+        self.assertListEqual(wrong, [0, 0, 0, 0])
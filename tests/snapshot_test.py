@@ -0,0 +1,109 @@
+from unittest import TestCase
+import os
+import json
+import tempfile
+
+from proxies import snapshot
+from proxies.snapshot import StaleSnapshotError, export_snapshot, load_snapshot
+from proxies.core import BaseViewContext
+from proxies.context_registry import LazyContext
+from proxies.model_view import BaseModelViewProxy
+from proxies.schema_helper import SchemaLabelProtocol
+
+class User(SchemaLabelProtocol):
+    labels = {'id': 'Id', 'fn': 'First Name', 'ln': 'Last Name'}
+
+
+class UserTable(BaseViewContext):
+    label_order = {'ln': 0, 'id': -1}
+
+    def render(self, *args, **kwargs):
+        return ','.join(self.labels)
+
+
+class UserForm(BaseViewContext):
+    def render(self, *args, **kwargs):
+        return 'form'
+
+
+def make_proxy(model=User):
+    proxy = BaseModelViewProxy(model)
+    proxy.register_context('table', 'default', UserTable)
+    proxy.register_context('table', 'lazy', 'tests.lazy_views:LazyTable')
+    proxy.register_context('form', 'default', UserForm)
+    return proxy
+
+
+class SnapshotTestCase(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'user.proxy.json')
+
+    def tearDown(self):
+        for name in os.listdir(self.directory):
+            os.unlink(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def test_dump(self):
+        document = snapshot.dump(make_proxy())
+        self.assertEqual(document['model'], 'tests.snapshot_test.User')
+        self.assertListEqual(document['contexts'], [
+            ['table', 'default', 'tests.snapshot_test:UserTable'],
+            ['table', 'lazy', 'tests.lazy_views:LazyTable'],
+            ['form', 'default', 'tests.snapshot_test:UserForm']])
+        self.assertListEqual(json.loads(snapshot.dumps(make_proxy()))['labels'],
+                [['id', 'Id'], ['fn', 'First Name'], ['ln', 'Last Name']])
+
+    def test_export_and_load(self):
+        export_snapshot(make_proxy(), self.path)
+        self.assertListEqual(os.listdir(self.directory), ['user.proxy.json'])
+        proxy = load_snapshot(BaseModelViewProxy(User), self.path)
+        self.assertFalse(proxy.frozen)
+        self.assertEqual(proxy.render('table'), 'ln,fn,id')
+        self.assertEqual(proxy.render('table.lazy'), '<table>lazy</table>')
+        self.assertEqual(proxy.render('form'), 'form')
+
+        proxy = load_snapshot(BaseModelViewProxy(User), self.path, freeze=True)
+        self.assertTrue(proxy.frozen)
+        self.assertEqual(proxy.render('table'), 'ln,fn,id')
+        self.assertEqual(proxy.render('table.lazy'), '<table>lazy</table>')
+
+    def test_frozen_load_is_lazy(self):
+        export_snapshot(make_proxy(), self.path)
+        proxy = load_snapshot(BaseModelViewProxy(User), self.path, freeze=True)
+        # nothing is imported or built until it's rendered
+        self.assertIsInstance(proxy.registerys['table']._contexts['lazy'], LazyContext)
+        self.assertIsInstance(proxy._resolved['table.lazy'][2], LazyContext)
+        self.assertDictEqual(proxy._ordered_labels, {})
+        self.assertEqual(proxy.render('table'), 'ln,fn,id')
+        self.assertListEqual(list(proxy._ordered_labels), [UserTable])
+        self.assertEqual(proxy.render('table.lazy'), '<table>lazy</table>')
+        self.assertNotIsInstance(proxy._resolved['table.lazy'][2], LazyContext)
+
+    def test_unexportable_contexts(self):
+        proxy = make_proxy()
+        proxy.register_context('form', 'instance', UserForm(model=User))
+        self.assertRaises(ValueError, snapshot.dump, proxy)
+
+        class Local(BaseViewContext):
+            pass
+
+        proxy = make_proxy()
+        proxy.register_context('form', 'local', Local)
+        self.assertRaises(ValueError, snapshot.dump, proxy)
+
+    def test_stale_snapshots(self):
+        class Changing(SchemaLabelProtocol):
+            labels = {'id': 'Id', 'fn': 'First Name'}
+
+        document = snapshot.dump(make_proxy(Changing))
+        snapshot.check(BaseModelViewProxy(Changing), document)
+        Changing.labels['fn'] = 'Name'
+        with self.assertRaises(StaleSnapshotError) as cm:
+            snapshot.load(BaseModelViewProxy(Changing), document)
+        self.assertIn(': fn', str(cm.exception))
+        self.assertRaises(StaleSnapshotError, snapshot.load, BaseModelViewProxy(User),
+                document)
+        self.assertRaises(StaleSnapshotError, snapshot.load, BaseModelViewProxy(Changing),
+                dict(document, version=0))
@@ -0,0 +1,28 @@
+from unittest import TestCase
+
+from proxies.stats import RenderStats
+
+class RenderStatsTestCase(TestCase):
+
+    def test_record(self):
+        s = RenderStats(buckets=(0.1, 1.0))
+        s.record('render', 'table.default', 0.05)
+        s.record('render', 'table.default', 0.5)
+        s.record('render', 'table.default', 2.0)
+        s.record('init_context', 'table.default', 0.1)
+        stats = s.as_dict()
+        table = stats['render']['table.default']
+        self.assertEqual(table['count'], 3)
+        self.assertAlmostEqual(table['total'], 2.55)
+        self.assertAlmostEqual(table['mean'], 0.85)
+        self.assertEqual(table['max'], 2.0)
+        self.assertListEqual(table['histogram'], [(0.1, 1), (1.0, 1), (None, 1)])
+        # bucket upper bounds are inclusive
+        self.assertListEqual(stats['init_context']['table.default']['histogram'],
+                [(0.1, 1), (1.0, 0), (None, 0)])
+
+    def test_reset(self):
+        s = RenderStats()
+        s.record('render', 'table.default', 0.05)
+        s.reset()
+        self.assertDictEqual(s.as_dict(), {})
@@ -0,0 +1,120 @@
+from unittest import TestCase
+from threading import Thread
+from contextvars import copy_context
+import asyncio
+import json
+
+from proxies import tracing
+from proxies.tracing import trace
+from proxies.core import BaseViewContext
+from proxies.model_view import BaseModelViewProxy
+from proxies.schema_helper import SchemaLabelProtocol
+
+class Labeled(SchemaLabelProtocol):
+    labels = {'id': 'Id'}
+
+
+class TableViewContext(BaseViewContext):
+    def render(self, *args, **kwargs):
+        return '<table></table>'
+
+
+class PageViewContext(BaseViewContext):
+    def render(self, proxy):
+        return '<body>' + proxy.render('table.default') + proxy.render('table.default') + \
+                '</body>'
+
+
+class AsyncPageViewContext(BaseViewContext):
+    async def render(self, proxy):
+        parts = await proxy.arender_all('table', 'table')
+        return ''.join(parts)
+
+
+def make_proxy():
+    m = BaseModelViewProxy(Labeled)
+    m.register_context('table', 'default', TableViewContext)
+    m.register_context('page', 'default', PageViewContext)
+    m.register_context('page', 'async', AsyncPageViewContext)
+    return m
+
+
+class TracingTestCase(TestCase):
+
+    def test_nested_renders(self):
+        m = make_proxy()
+        with trace() as t:
+            m.render('page', m)
+            m.get_renderer('table')()
+        page, table = t.children
+        self.assertEqual(page.name, 'page.default')
+        self.assertEqual((page.key, page.sub_key), ('page', 'default'))
+        self.assertEqual(page.model, 'tests.tracing_test.Labeled')
+        self.assertListEqual([c.name for c in page.children], ['table.default'] * 2)
+        self.assertEqual(table.name, 'table.default')
+        self.assertGreaterEqual(page.duration, sum(c.duration for c in page.children))
+        self.assertEqual(len(list(t.spans())), 4)
+        self.assertEqual(tracing.active, 0)
+
+    def test_no_spans_outside_a_trace(self):
+        m = make_proxy()
+        with trace() as t:
+            pass
+        m.render('page', m)
+        self.assertListEqual(t.children, [])
+
+    def test_threads(self):
+        m = make_proxy()
+        with trace() as t:
+            # a new thread is outside of the trace
+            thread = Thread(target=m.render, args=('table',))
+            thread.start()
+            thread.join()
+            self.assertListEqual(t.children, [])
+            # unless it runs in a copy of the context
+            context = copy_context()
+            thread = Thread(target=context.run, args=(m.render, 'page', m))
+            thread.start()
+            thread.join()
+        page, = t.children
+        self.assertEqual(len(page.children), 2)
+        self.assertEqual(page.children[0].thread, page.thread)
+
+    def test_asyncio(self):
+        m = make_proxy()
+
+        async def main():
+            with trace() as t:
+                await m.arender_all(('page.async', (m,)), 'table')
+            return t
+
+        t = asyncio.run(main())
+        self.assertListEqual(sorted(s.name for s in t.children), ['page.async', 'table.default'])
+        page = [s for s in t.children if s.name == 'page.async'][0]
+        self.assertListEqual([c.name for c in page.children], ['table.default'] * 2)
+
+    def test_asyncio_sync_context(self):
+        m = make_proxy()
+
+        async def main():
+            with trace() as t:
+                await m.arender('page', m)
+            return t
+
+        t = asyncio.run(main())
+        page, = t.children
+        self.assertEqual(page.name, 'page.default')
+        self.assertListEqual([c.name for c in page.children], ['table.default'] * 2)
+
+    def test_exports(self):
+        m = make_proxy()
+        with trace() as t:
+            m.render('page', m)
+        document = json.loads(t.to_json())
+        self.assertEqual(document['spans'][0]['name'], 'page.default')
+        self.assertEqual(len(document['spans'][0]['children']), 2)
+        events = t.to_chrome_trace()['traceEvents']
+        self.assertEqual(len(events), 3)
+        self.assertEqual(events[0]['ph'], 'X')
+        self.assertEqual(events[0]['args']['key'], 'page')
+        self.assertLessEqual(events[0]['ts'], events[1]['ts'])
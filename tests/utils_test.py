@@ -28,6 +28,45 @@ class UtilTestCase(TestCase):
             count += 1
 
 
+    def test_ordered_labels_orders_by_value(self):
+        ordered = OrderedLabels(labels, {'ln': 0, 'fn': 1, 'email': -1, 'id': -2})
+        self.assertListEqual(list(ordered), ['ln', 'fn', 'id', 'email'])
+
+    def test_ordered_labels_with_only_negative_orders(self):
+        ordered = OrderedLabels(labels, {'fn': -1})
+        self.assertListEqual(list(ordered), ['id', 'email', 'ln', 'fn'])
+        self.assertDictEqual(ordered, labels)
+
+    def test_ordered_labels_without_order(self):
+        ordered = OrderedLabels(labels, {})
+        self.assertListEqual(list(ordered), list(labels))
+
+    def test_ordered_labels_raises_key_error_for_unknown_order_key(self):
+        self.assertRaises(KeyError, OrderedLabels, labels, {'fails': 0})
+
+    def test_ordered_labels_key_order_is_cached(self):
+        columns = dict(('col{}'.format(i), 'Col {}'.format(i)) for i in range(250))
+        order = {'col10': 0, 'col5': -1}
+        first = OrderedLabels.key_order(tuple(columns), order)
+        self.assertIs(OrderedLabels.key_order(tuple(columns), dict(order)), first)
+        self.assertEqual(first[0], 'col10')
+        self.assertEqual(first[-1], 'col5')
+        self.assertEqual(len(first), 250)
+        # a different order or set of keys is a different cache entry
+        self.assertIsNot(OrderedLabels.key_order(tuple(columns), {'col10': 0}), first)
+        self.assertListEqual(list(OrderedLabels(columns, order)), list(first))
+
+    def test_ordered_labels_copies_are_sorted_again_after_changes(self):
+        order = {'fn': 0, 'id': -1}
+        ordered = OrderedLabels(labels, order)
+        self.assertListEqual(list(OrderedLabels(ordered, order)), list(ordered))
+        ordered['phone'] = 'Phone'
+        self.assertEqual(list(ordered)[-1], 'phone')
+        self.assertEqual(list(OrderedLabels(ordered, order))[-1], 'id')
+        ordered = OrderedLabels(labels, order)
+        ordered.move_to_end('fn')
+        self.assertEqual(list(OrderedLabels(ordered, order))[0], 'fn')
+
     def test_ordered_labels_update_returns_self(self):
         ordered = OrderedLabels(labels, {'fn': 0, 'ln': 1})
         self.assertEqual(ordered.update({'id': 'Edit'}), ordered)